@@ -0,0 +1,89 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import {IERC20} from '../node_modules/@openzeppelin/contracts/token/ERC20/IERC20.sol';
+import {MerkleProof} from '../node_modules/@openzeppelin/contracts/utils/cryptography/MerkleProof.sol';
+import {Ownable} from '../node_modules/@openzeppelin/contracts/access/Ownable.sol';
+import {SafeERC20} from "../node_modules/@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+
+/**
+ * @title CumulativeMerkleDistributor
+ * @notice Distributes a token over successive rounds from a single contract.
+ * @dev Every root commits to the cumulative amount of each account over all rounds so far, with the same
+ * leaf encoding as MerkleDistributor: keccak256(abi.encodePacked(uint256 index, address account,
+ * uint256 cumulativeAmount)). A claim pays the difference with what the account has already claimed, so
+ * all outstanding rounds are collected with one proof and one transfer. Trees are generated by
+ * scripts/cumulative.py.
+ */
+contract CumulativeMerkleDistributor is Ownable {
+    using SafeERC20 for IERC20;
+
+    address public immutable token;
+    bytes32 public merkleRoot;
+    uint256 public round;
+
+    // Cumulative amount already paid to each account
+    mapping(address => uint256) public cumulativeClaimed;
+
+    event MerkleRootUpdated(uint256 round, bytes32 merkleRoot);
+    event Claimed(address account, uint256 amount, uint256 cumulativeAmount);
+
+    constructor(address token_, bytes32 merkleRoot_) Ownable() {
+        token = token_;
+        _setMerkleRoot(merkleRoot_);
+    }
+
+    /**
+     * @notice Publishes the root of a new round. The new tree must hold cumulative amounts that are at least
+     * those of the previous round for every account, and the contract must be funded for the difference.
+     * @dev Only callable by Owner.
+     * @param merkleRoot_ Root of the cumulative tree.
+     */
+    function setMerkleRoot(bytes32 merkleRoot_) external onlyOwner {
+        _setMerkleRoot(merkleRoot_);
+    }
+
+    function _setMerkleRoot(bytes32 merkleRoot_) private {
+        merkleRoot = merkleRoot_;
+        round++;
+        emit MerkleRootUpdated(round, merkleRoot_);
+    }
+
+    /**
+     * @notice Pays account everything it has not claimed yet, up to its cumulative amount in the current root.
+     * @param index Leaf index of the account in the current tree.
+     * @param account Account being paid.
+     * @param cumulativeAmount Total amount of the account over all rounds.
+     * @param merkleProof Proof of the leaf.
+     */
+    function claim(
+        uint256 index,
+        address account,
+        uint256 cumulativeAmount,
+        bytes32[] calldata merkleProof
+    ) external {
+        bytes32 node = keccak256(abi.encodePacked(index, account, cumulativeAmount));
+        require(
+            MerkleProof.verifyCalldata(merkleProof, merkleRoot, node),
+            'CumulativeMerkleDistributor: Invalid proof.'
+        );
+
+        uint256 claimed = cumulativeClaimed[account];
+        require(cumulativeAmount > claimed, 'CumulativeMerkleDistributor: Nothing to claim.');
+        cumulativeClaimed[account] = cumulativeAmount;
+
+        uint256 amount = cumulativeAmount - claimed;
+        IERC20(token).safeTransfer(account, amount);
+        emit Claimed(account, amount, cumulativeAmount);
+    }
+
+    /**
+     * @notice Transfers all of an ERC20 token from this contract to a target address.
+     * @dev Only callable by Owner.
+     * @param tokenAddress The address of the ERC20 token to be transferred.
+     * @param target The address that will receive the ERC20 tokens.
+     */
+    function rescueERC20(address tokenAddress, address target) external onlyOwner {
+        IERC20(tokenAddress).safeTransfer(target, IERC20(tokenAddress).balanceOf(address(this)));
+    }
+}
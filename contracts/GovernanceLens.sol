@@ -0,0 +1,81 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.19;
+
+import "./esNUT.sol";
+import "./NutGovernor.sol";
+
+/**
+ * @title GovernanceLens
+ * @notice Read-only batch views over esNUT voting power and NutGovernor votes, for dashboards and proposal tooling.
+ * @dev Nothing is stored, so one lens serves every esNUT and governor. Each account costs a few storage reads
+ * plus a binary search over its checkpoints; scripts/governanceLens.py splits large account lists into calls
+ * that stay well within a node's eth_call gas limit.
+ */
+contract GovernanceLens {
+    struct AccountVotes {
+        address account;
+        uint256 balance;
+        uint256 votes;       // Current voting power
+        uint256 pastVotes;   // Voting power at the requested block
+        address delegatee;
+    }
+
+    struct VoterReceipt {
+        address voter;
+        bool hasVoted;
+        uint8 support;       // 0 = against, 1 = for, 2 = abstain
+        uint96 votes;
+    }
+
+    struct ProposalVotes {
+        uint8 state;
+        uint256 snapshot;
+        uint256 deadline;
+        uint256 forVotes;
+        uint256 againstVotes;
+        uint256 abstainVotes;
+        uint256 quorum;
+    }
+
+    /**
+     * @notice Balance, voting power and delegate of every account.
+     * @param token The esNUT token.
+     * @param accounts Accounts to read.
+     * @param blockNumber Block of pastVotes. The current block or later reads the current voting power.
+     */
+    function getAccountVotes(esNUT token, address[] calldata accounts, uint256 blockNumber) external view returns (AccountVotes[] memory result) {
+        bool past = blockNumber < block.number;
+        result = new AccountVotes[](accounts.length);
+        for (uint256 i = 0; i < accounts.length; i++) {
+            address account = accounts[i];
+            uint256 votes = token.getVotes(account);
+            result[i] = AccountVotes(
+                account,
+                token.balanceOf(account),
+                votes,
+                past ? token.getPastVotes(account, blockNumber) : votes,
+                token.delegates(account)
+            );
+        }
+    }
+
+    /**
+     * @notice Tallies of a proposal and the vote receipt of every voter.
+     * @param governor The NutGovernor.
+     * @param proposalId Id of the proposal.
+     * @param voters Accounts to read receipts for.
+     */
+    function getProposalVotes(NutGovernor governor, uint256 proposalId, address[] calldata voters) external view returns (ProposalVotes memory tally, VoterReceipt[] memory receipts) {
+        tally.state = uint8(governor.state(proposalId));
+        tally.snapshot = governor.proposalSnapshot(proposalId);
+        tally.deadline = governor.proposalDeadline(proposalId);
+        (, , , , , tally.forVotes, tally.againstVotes, tally.abstainVotes, , ) = governor.proposals(proposalId);
+        if (tally.snapshot < block.number) tally.quorum = governor.quorum(tally.snapshot);
+
+        receipts = new VoterReceipt[](voters.length);
+        for (uint256 i = 0; i < voters.length; i++) {
+            IGovernorCompatibilityBravo.Receipt memory receipt = governor.getReceipt(proposalId, voters[i]);
+            receipts[i] = VoterReceipt(voters[i], receipt.hasVoted, receipt.support, receipt.votes);
+        }
+    }
+}
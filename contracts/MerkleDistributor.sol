@@ -5,6 +5,7 @@ import {IERC20} from '../../node_modules/@openzeppelin/contracts/token/ERC20/IER
 import {MerkleProof} from '../../node_modules/@openzeppelin/contracts/utils/cryptography/MerkleProof.sol';
 import {Ownable} from '../../node_modules/@openzeppelin/contracts/access/Ownable.sol';
 import {SafeERC20} from "../node_modules/@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import {Initializable} from "../node_modules/@openzeppelin/contracts/proxy/utils/Initializable.sol";
 
 
 // Allows anyone to claim a token if they exist in a merkle root.
@@ -18,6 +19,9 @@ interface IMerkleDistributor {
     // Returns true if the index has been marked claimed.
     function isClaimed(uint256 index) external view returns (bool);
 
+    // Returns count claimed bitmap words from startWord, each covering 256 indices, and the number of claimed indices in them.
+    function claimedWords(uint256 startWord, uint256 count) external view returns (uint256[] memory words, uint256 claimedCount);
+
     // Claim the given amount of the token to the given address. Reverts if the inputs are invalid.
     function claim(
         uint256 index,
@@ -26,23 +30,46 @@ interface IMerkleDistributor {
         bytes32[] calldata merkleProof
     ) external;
 
+    // Claim several leaves at once with a single multiproof. Leaves must be ordered as in the multiproof.
+    function claimMulti(
+        uint256[] calldata indices,
+        address[] calldata accounts,
+        uint256[] calldata amounts,
+        bytes32[] calldata proof,
+        bool[] calldata proofFlags
+    ) external;
+
+    // Claim several leaves, each with its own proof. Only adjacent entries are merged: a bitmap word is written once
+    // per run of consecutive entries in it, and an account is paid once per run of consecutive entries for it.
+    // Callers must sort the batch by index, with the leaves of an account next to each other, to get the savings;
+    // unsorted batches are still correct but pay a bitmap write and a transfer per run.
+    function claimBatch(
+        uint256[] calldata indices,
+        address[] calldata accounts,
+        uint256[] calldata amounts,
+        bytes32[][] calldata merkleProofs
+    ) external;
+
+    // Claim with the index, account, amount and proof tightly packed in the calldata instead of ABI encoded.
+    function claimCompact() external;
+
     // This event is triggered whenever a call to #claim succeeds.
     event Claimed(uint256 index, address account, uint256 amount);
 }
 
-contract MerkleDistributor is IMerkleDistributor, Ownable {
+/**
+ * @dev Claim logic of MerkleDistributor and MerkleDistributorClone, which only differ in where token and merkleRoot
+ * are kept: immutables for a direct deployment, storage set by the initializer for a clone.
+ */
+abstract contract MerkleDistributorBase is IMerkleDistributor, Ownable {
     using SafeERC20 for IERC20;
 
-    address public immutable override token;
-    bytes32 public immutable override merkleRoot;
-
     // This is a packed array of booleans.
     mapping(uint256 => uint256) private claimedBitMap;
 
-    constructor(address token_, bytes32 merkleRoot_) Ownable() {
-        token = token_;
-        merkleRoot = merkleRoot_;
-    }
+    function _token() internal view virtual returns (address);
+
+    function _merkleRoot() internal view virtual returns (bytes32);
 
     function isClaimed(uint256 index) public view override returns (bool) {
         uint256 claimedWordIndex = index / 256;
@@ -60,31 +87,226 @@ contract MerkleDistributor is IMerkleDistributor, Ownable {
             (1 << claimedBitIndex);
     }
 
+    /**
+     * @notice Raw claimed bitmap words for a range of word indices, so claim status of a whole distribution
+     * can be read in a few calls instead of one isClaimed call per index.
+     * @dev Bit i of word w is index w * 256 + i. Each word costs a cold storage read (~2.1k gas), so 4096
+     * words (about 1M indices) stay around 10M gas. scripts/claimStatus.py decodes the words.
+     * @param startWord First word index.
+     * @param count Number of words to read.
+     * @return words The bitmap words.
+     * @return claimedCount Number of claimed indices in the words.
+     */
+    function claimedWords(uint256 startWord, uint256 count) external view override returns (uint256[] memory words, uint256 claimedCount) {
+        words = new uint256[](count);
+        for (uint256 i = 0; i < count; i++) {
+            uint256 word = claimedBitMap[startWord + i];
+            words[i] = word;
+            if (word != 0) claimedCount += _popCount(word);
+        }
+    }
+
+    // Number of set bits, summing bit counts over 2, 4, 8 then 16 bit lanes
+    function _popCount(uint256 x) private pure returns (uint256) {
+        unchecked {
+            x -= (x >> 1) & 0x5555555555555555555555555555555555555555555555555555555555555555;
+            x = (x & 0x3333333333333333333333333333333333333333333333333333333333333333) + ((x >> 2) & 0x3333333333333333333333333333333333333333333333333333333333333333);
+            x = (x + (x >> 4)) & 0x0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f;
+            x = (x + (x >> 8)) & 0x00ff00ff00ff00ff00ff00ff00ff00ff00ff00ff00ff00ff00ff00ff00ff00ff;
+            return (x * 0x0001000100010001000100010001000100010001000100010001000100010001) >> 240;
+        }
+    }
+
     function claim(
         uint256 index,
         address account,
         uint256 amount,
         bytes32[] calldata merkleProof
     ) external override {
+        _claim(index, account, amount, merkleProof);
+    }
+
+    /**
+     * @notice Same as claim, with the arguments packed for L2 deployments where calldata dominates cost.
+     * @dev Takes no ABI arguments. The calldata after the selector is uint32 index, address account and
+     * uint96 amount, tightly packed (36 bytes), followed by the proof as raw concatenated 32-byte hashes.
+     * The leaf is still keccak256(abi.encodePacked(uint256 index, account, uint256 amount)), so the trees
+     * and roots produced by scripts/merkle.py are unchanged. encodeCompactClaim in scripts/merkle.py builds
+     * the calldata.
+     */
+    function claimCompact() external override {
+        bytes calldata data = msg.data[4:];
+        require(
+            data.length >= 36 && (data.length - 36) % 32 == 0,
+            'MerkleDistributor: Invalid calldata.'
+        );
+        bytes32[] calldata merkleProof;
+        assembly {
+            merkleProof.offset := add(data.offset, 36)
+            merkleProof.length := shr(5, sub(data.length, 36))
+        }
+        _claim(
+            uint32(bytes4(data[0:4])),
+            address(bytes20(data[4:24])),
+            uint96(bytes12(data[24:36])),
+            merkleProof
+        );
+    }
+
+    function _claim(
+        uint256 index,
+        address account,
+        uint256 amount,
+        bytes32[] calldata merkleProof
+    ) private {
         require(!isClaimed(index), 'MerkleDistributor: Drop already claimed.');
 
         // Verify the merkle proof.
         bytes32 node = keccak256(abi.encodePacked(index, account, amount));
         require(
-            MerkleProof.verify(merkleProof, merkleRoot, node),
+            MerkleProof.verifyCalldata(merkleProof, _merkleRoot(), node),
             'MerkleDistributor: Invalid proof.'
         );
 
         // Mark it claimed and send the token.
         _setClaimed(index);
         require(
-            IERC20(token).transfer(account, amount),
+            IERC20(_token()).transfer(account, amount),
             'MerkleDistributor: Transfer failed.'
         );
 
         emit Claimed(index, account, amount);
     }
 
+    /**
+     * @notice Claims several leaves with one OpenZeppelin multiproof, so shared internal nodes are hashed once.
+     * @dev Leaves are passed in the order the multiproof consumes them (ascending index for scripts/merkle.py).
+     * @param indices Leaf indices being claimed.
+     * @param accounts Account of each leaf.
+     * @param amounts Amount of each leaf.
+     * @param proof Multiproof sibling hashes.
+     * @param proofFlags Multiproof flags, true when both hashed nodes come from leaves or earlier hashes.
+     */
+    function claimMulti(
+        uint256[] calldata indices,
+        address[] calldata accounts,
+        uint256[] calldata amounts,
+        bytes32[] calldata proof,
+        bool[] calldata proofFlags
+    ) external override {
+        require(
+            indices.length == accounts.length && indices.length == amounts.length,
+            'MerkleDistributor: Length mismatch.'
+        );
+
+        // Mark all leaves claimed first, reverting everything if the multiproof is invalid
+        bytes32[] memory leaves = _claimLeaves(indices, accounts, amounts);
+        require(
+            MerkleProof.multiProofVerifyCalldata(proof, proofFlags, _merkleRoot(), leaves),
+            'MerkleDistributor: Invalid proof.'
+        );
+
+        for (uint256 i = 0; i < indices.length; i++) {
+            require(
+                IERC20(_token()).transfer(accounts[i], amounts[i]),
+                'MerkleDistributor: Transfer failed.'
+            );
+            emit Claimed(indices[i], accounts[i], amounts[i]);
+        }
+    }
+
+    /**
+     * @notice Claims several leaves, each with its own proof, for a relayer claiming on behalf of many accounts.
+     * @dev Consecutive indices in the same 256-bit bitmap word share one storage read and one write, and
+     * consecutive claims to the same account are paid with one transfer. Nothing is grouped across
+     * non-adjacent entries, so callers must sort the batch by index, keeping the leaves of an account
+     * together, to bring the cost close to one bitmap write per 256 claims. All bitmap words are written
+     * before any transfer is made.
+     * @param indices Leaf indices being claimed.
+     * @param accounts Account of each leaf.
+     * @param amounts Amount of each leaf.
+     * @param merkleProofs Proof of each leaf.
+     */
+    function claimBatch(
+        uint256[] calldata indices,
+        address[] calldata accounts,
+        uint256[] calldata amounts,
+        bytes32[][] calldata merkleProofs
+    ) external override {
+        require(
+            accounts.length == indices.length && amounts.length == indices.length && merkleProofs.length == indices.length,
+            'MerkleDistributor: Length mismatch.'
+        );
+
+        // Bitmap, proofs and payments are handled in separate frames to stay within the stack limit
+        _setClaimedBatch(indices);
+        bytes32 root = _merkleRoot();
+        for (uint256 i = 0; i < indices.length; i++) {
+            bytes32 node = keccak256(abi.encodePacked(indices[i], accounts[i], amounts[i]));
+            require(
+                MerkleProof.verifyCalldata(merkleProofs[i], root, node),
+                'MerkleDistributor: Invalid proof.'
+            );
+            emit Claimed(indices[i], accounts[i], amounts[i]);
+        }
+        _payBatch(accounts, amounts);
+    }
+
+    // Marks every index claimed, reading and writing each run of indices in the same bitmap word once
+    function _setClaimedBatch(uint256[] calldata indices) private {
+        uint256 wordIndex = 0;
+        uint256 word = 0;
+        bool wordLoaded = false;
+        for (uint256 i = 0; i < indices.length; i++) {
+            uint256 index = indices[i];
+            if (!wordLoaded || index / 256 != wordIndex) {
+                if (wordLoaded) claimedBitMap[wordIndex] = word;
+                wordIndex = index / 256;
+                word = claimedBitMap[wordIndex];
+                wordLoaded = true;
+            }
+            uint256 mask = 1 << (index % 256);
+            require(word & mask == 0, 'MerkleDistributor: Drop already claimed.');
+            word |= mask;
+        }
+        if (wordLoaded) claimedBitMap[wordIndex] = word;
+    }
+
+    // Pays consecutive amounts to the same account with one transfer
+    function _payBatch(address[] calldata accounts, uint256[] calldata amounts) private {
+        if (accounts.length == 0) return;
+        address payee = accounts[0];
+        uint256 payout = 0;
+        for (uint256 i = 0; i < accounts.length; i++) {
+            if (accounts[i] != payee) {
+                require(
+                    IERC20(_token()).transfer(payee, payout),
+                    'MerkleDistributor: Transfer failed.'
+                );
+                payee = accounts[i];
+                payout = 0;
+            }
+            payout += amounts[i];
+        }
+        require(
+            IERC20(_token()).transfer(payee, payout),
+            'MerkleDistributor: Transfer failed.'
+        );
+    }
+
+    function _claimLeaves(
+        uint256[] calldata indices,
+        address[] calldata accounts,
+        uint256[] calldata amounts
+    ) private returns (bytes32[] memory leaves) {
+        leaves = new bytes32[](indices.length);
+        for (uint256 i = 0; i < indices.length; i++) {
+            require(!isClaimed(indices[i]), 'MerkleDistributor: Drop already claimed.');
+            _setClaimed(indices[i]);
+            leaves[i] = keccak256(abi.encodePacked(indices[i], accounts[i], amounts[i]));
+        }
+    }
+
     /**
      * @notice Transfers all of an ERC20 token from this contract to a target address.
      * @dev Only callable by Owner.
@@ -96,3 +318,55 @@ contract MerkleDistributor is IMerkleDistributor, Ownable {
     }
 
 }
+
+contract MerkleDistributor is MerkleDistributorBase {
+    address public immutable override token;
+    bytes32 public immutable override merkleRoot;
+
+    constructor(address token_, bytes32 merkleRoot_) {
+        token = token_;
+        merkleRoot = merkleRoot_;
+    }
+
+    function _token() internal view override returns (address) {
+        return token;
+    }
+
+    function _merkleRoot() internal view override returns (bytes32) {
+        return merkleRoot;
+    }
+}
+
+/**
+ * @title MerkleDistributorClone
+ * @notice MerkleDistributor for EIP-1167 clones made by MerkleDistributorFactory. Token, root and owner are set
+ * once by initialize, as a clone runs no constructor.
+ */
+contract MerkleDistributorClone is MerkleDistributorBase, Initializable {
+    address public override token;
+    bytes32 public override merkleRoot;
+
+    constructor() {
+        _disableInitializers();
+    }
+
+    /**
+     * @notice Sets the distribution of a clone, called by the factory in the transaction creating it.
+     * @param token_ The token distributed.
+     * @param merkleRoot_ The merkle root of the distribution.
+     * @param owner_ The owner, allowed to rescueERC20.
+     */
+    function initialize(address token_, bytes32 merkleRoot_, address owner_) external initializer {
+        token = token_;
+        merkleRoot = merkleRoot_;
+        _transferOwnership(owner_);
+    }
+
+    function _token() internal view override returns (address) {
+        return token;
+    }
+
+    function _merkleRoot() internal view override returns (bytes32) {
+        return merkleRoot;
+    }
+}
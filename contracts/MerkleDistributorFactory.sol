@@ -0,0 +1,53 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "./MerkleDistributor.sol";
+import {Clones} from "../node_modules/@openzeppelin/contracts/proxy/Clones.sol";
+
+/**
+ * @title MerkleDistributorFactory
+ * @notice Deploys each distribution as an EIP-1167 clone of one MerkleDistributorClone, instead of a full
+ * MerkleDistributor. Clones are created with CREATE2, so a distribution's address is known before it is deployed.
+ * @dev The CREATE2 salt commits to the token, root and owner as well as the caller's salt, so the predicted address
+ * can only ever hold that exact distribution. Clones cost an extra DELEGATECALL per call and read token and root from
+ * storage, a few thousand gas per claim, against most of the deployment cost saved.
+ */
+contract MerkleDistributorFactory {
+    using SafeERC20 for IERC20;
+
+    /// @notice The MerkleDistributorClone every distribution delegates to
+    address public immutable implementation;
+
+    event DistributorCreated(address indexed distributor, address indexed token, bytes32 merkleRoot, address owner, bytes32 salt);
+
+    constructor() {
+        implementation = address(new MerkleDistributorClone());
+    }
+
+    /**
+     * @notice Deploys and initializes the distributor of a merkle root, optionally funding it in the same transaction.
+     * @param token The token distributed.
+     * @param merkleRoot The merkle root of the distribution.
+     * @param owner The owner of the distributor, allowed to rescueERC20.
+     * @param salt Any value distinguishing distributions of the same token, root and owner, e.g. a hash of its name.
+     * @param funding Amount of token moved from the caller to the distributor, approved to this factory beforehand.
+     * @return distributor The address of the distributor, as returned by predictDistributor.
+     */
+    function createDistributor(address token, bytes32 merkleRoot, address owner, bytes32 salt, uint256 funding) external returns (address distributor) {
+        distributor = Clones.cloneDeterministic(implementation, _salt(token, merkleRoot, owner, salt));
+        MerkleDistributorClone(distributor).initialize(token, merkleRoot, owner);
+        if (funding > 0) IERC20(token).safeTransferFrom(msg.sender, distributor, funding);
+        emit DistributorCreated(distributor, token, merkleRoot, owner, salt);
+    }
+
+    /**
+     * @notice Address createDistributor deploys the distributor to for the same arguments.
+     */
+    function predictDistributor(address token, bytes32 merkleRoot, address owner, bytes32 salt) external view returns (address) {
+        return Clones.predictDeterministicAddress(implementation, _salt(token, merkleRoot, owner, salt));
+    }
+
+    function _salt(address token, bytes32 merkleRoot, address owner, bytes32 salt) private pure returns (bytes32) {
+        return keccak256(abi.encode(token, merkleRoot, owner, salt));
+    }
+}
@@ -2,6 +2,7 @@
 pragma solidity ^0.8.0;
 
 import "./MerkleDistributor.sol"; // Import the MerkleDistributor contract
+import {Address} from "../node_modules/@openzeppelin/contracts/utils/Address.sol";
 
 contract MultiClaim {
     struct ClaimParam {
@@ -27,4 +28,24 @@ contract MultiClaim {
             );
         }
     }
+
+    /**
+     * @notice Processes multiple compact claims in a single transaction, for L2 deployments.
+     * @dev Takes no ABI arguments. The calldata after the selector is a sequence of claims, each being the
+     * distributor address (20 bytes), the number of proof hashes (1 byte), then the MerkleDistributor.claimCompact
+     * calldata of the claim. encodeCompactMultiClaim in scripts/merkle.py builds it.
+     */
+    function multiClaimCompact() external {
+        bytes calldata data = msg.data[4:];
+        uint256 offset = 0;
+        while (offset < data.length) {
+            address merkleAddress = address(bytes20(data[offset:offset + 20]));
+            uint256 end = offset + 57 + uint256(uint8(data[offset + 20])) * 32;
+            Address.functionCall(
+                merkleAddress,
+                abi.encodePacked(IMerkleDistributor.claimCompact.selector, data[offset + 21:end])
+            );
+            offset = end;
+        }
+    }
 }
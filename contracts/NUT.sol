@@ -6,6 +6,13 @@ import "../node_modules/@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol"
 import "../node_modules/@openzeppelin/contracts/token/ERC20/extensions/ERC20Capped.sol";
 import "../node_modules/@openzeppelin/contracts/token/ERC20/presets/ERC20PresetMinterPauser.sol";
 
+/**
+ * @notice Contract told about every pause and unpause of NUTS, so it can mirror the state without calling paused()
+ */
+interface IPauseListener {
+    function setNutPaused(bool paused) external;
+}
+
 /**
  * @title Thetanuts Finance Governance Token (NUTS) Token Contract
  * @notice This contract manages the NUTS token, a standard ERC20 token with capabilities for minting and pausing.
@@ -20,6 +27,9 @@ contract NUT is ERC20, ERC20PresetMinterPauser, ERC20Capped {
 
     /// @notice Access role for addresses who are allowed to grant/revoke RESCUE_ROLE and PAUSER_ROLE   
     bytes32 public constant ADMIN_ROLE = keccak256("RESCUE_ADMIN_ROLE");
+
+    /// @notice Contract notified of pause state changes, the paired veNUTS
+    address public pauseListener;
    
     /**
      * @notice Constructs the NUTS token contract.
@@ -56,6 +66,30 @@ contract NUT is ERC20, ERC20PresetMinterPauser, ERC20Capped {
         super._mint(account, amount);
     }
     
+    /**
+     * @notice Sets the contract notified of pause state changes. Set once by veNUTS when it deploys NUTS.
+     * @param _pauseListener Address of the listener
+     */
+    function setPauseListener(address _pauseListener) external onlyRole(DEFAULT_ADMIN_ROLE) {
+        pauseListener = _pauseListener;
+    }
+
+    /**
+     * @dev Pauses all token transfers and notifies the pause listener.
+     */
+    function pause() public override {
+        super.pause();
+        if (pauseListener != address(0)) IPauseListener(pauseListener).setNutPaused(true);
+    }
+
+    /**
+     * @dev Unpauses all token transfers and notifies the pause listener.
+     */
+    function unpause() public override {
+        super.unpause();
+        if (pauseListener != address(0)) IPauseListener(pauseListener).setNutPaused(false);
+    }
+
     /**
      * @notice Burns an amount of NUTS tokens from the specified account.
      *         This can only be done by the veNUTS contract, and can only be initiated by account holder
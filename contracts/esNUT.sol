@@ -22,6 +22,12 @@ contract esNUT is ERC20, ERC20Permit, ERC20Votes, AccessControlEnumerable {
 
     // Indicates whether the token transfers are locked or unlocked
     bool public tokenLocked;
+
+    // Pause state of NUTS, pushed by NUTS on every pause and unpause
+    bool public nutPaused;
+
+    // Cap of NUTS + veNUTS total supply, the immutable cap of NUTS
+    uint256 public constant CAP = 1e28;
  
     /// @notice Access role for addresses who are allowed to receive/transfer veNUTS 
     bytes32 public constant TRANSFER_ROLE = keccak256("TRANSFER_ROLE");
@@ -44,6 +50,7 @@ contract esNUT is ERC20, ERC20Permit, ERC20Votes, AccessControlEnumerable {
         nutToken = new NUT();
         nutToken.grantRole(nutToken.ADMIN_ROLE(), msg.sender);
         nutToken.grantRole(nutToken.MINTER_ROLE(), address(this));
+        nutToken.setPauseListener(address(this));
         nutToken.renounceRole(nutToken.DEFAULT_ADMIN_ROLE(), address(this));
 
         emit TokenLock(true);
@@ -73,6 +80,7 @@ contract esNUT is ERC20, ERC20Permit, ERC20Votes, AccessControlEnumerable {
 
     /**
      * @notice Override for _beforeTokenTransfer. Adds additional checks for transfer restrictions and pausing.
+     * @dev Reads the pause state mirrored from NUTS, so transfers make no external call
      * @param from Address transferring from
      * @param to Address transferring to
      * @param amount Amount of tokens being transferred
@@ -82,13 +90,24 @@ contract esNUT is ERC20, ERC20Permit, ERC20Votes, AccessControlEnumerable {
         if (from != address(0) && to != address(0) && tokenLocked) {
             require(hasRole(TRANSFER_ROLE, from) || hasRole(TRANSFER_ROLE, to), "veUTS: Neither sender nor recipient has TRANSFER_ROLE");
         }
-        require(nutToken.paused() == false, "Paused");  // If NUT token is paused, veNUTS should also be paused
+        require(!nutPaused, "Paused");  // If NUT token is paused, veNUTS should also be paused
+    }
+
+    /**
+     * @notice Mirrors the pause state of NUTS. Only callable by NUTS, from its pause and unpause.
+     * @param paused Whether NUTS is paused
+     */
+    function setNutPaused(bool paused) external {
+        require(msg.sender == address(nutToken), "veNUTS: Only NUTS can set pause state");
+        nutPaused = paused;
     }
 
-    // Modifier to ensure the invariant between veNUTS and NUT total supplies
+    // Modifier to ensure the invariant between veNUTS and NUT total supplies.
+    // Only minting veNUTS can raise the combined supply: unlock and lock burn exactly what they mint, and NUTS
+    // enforces its own cap, so those need no check.
     modifier checkInvariantAfter {
         _;
-        require(nutToken.totalSupply() + totalSupply() <= nutToken.cap(), "veNUTS: NUT + veNUTS invariant breached");
+        require(nutToken.totalSupply() + totalSupply() <= CAP, "veNUTS: NUT + veNUTS invariant breached");
     }
 
     /**
@@ -113,21 +132,59 @@ contract esNUT is ERC20, ERC20Permit, ERC20Votes, AccessControlEnumerable {
      * @param account Address of the account unlocking their veNUTS
      * @param unlockAmount Amount of veNUTS to unlock
      */
-    function unlock(address account, uint256 unlockAmount) public onlyRole(UNLOCK_ROLE) checkInvariantAfter {
+    function unlock(address account, uint256 unlockAmount) public onlyRole(UNLOCK_ROLE) {
+        _unlock(account, account, unlockAmount);
+    }
+
+    /**
+     * @notice Allows specified accounts to unlock veNUTS of one account into NUTS of another, saving a NUTS transfer
+     * @param account Address of the account whose veNUTS are burnt
+     * @param recipient Address receiving the NUTS
+     * @param unlockAmount Amount of veNUTS to unlock
+     */
+    function unlockTo(address account, address recipient, uint256 unlockAmount) public onlyRole(UNLOCK_ROLE) {
+        _unlock(account, recipient, unlockAmount);
+    }
+
+    function _unlock(address account, address recipient, uint256 unlockAmount) internal {
         require(balanceOf(account) >= unlockAmount, "veNUTS: Insufficient Balance to unlock");
         _burn(account, unlockAmount);
-        nutToken.mint(account, unlockAmount);
+        nutToken.mint(recipient, unlockAmount);
     }
 
     /**
      * @notice Locks NUT to mint equivalent veNUTS for the caller
      * @param amount Amount of NUTS to lock
      */
-    function lock(uint256 amount) public checkInvariantAfter {
+    function lock(uint256 amount) public {
         nutToken.burn(msg.sender, amount);
         _mint(msg.sender, amount);
     }
 
+    /**
+     * @notice Transfers veNUTS from the caller to several recipients, e.g. to fund a cohort of vesting schedules
+     * @dev Each transfer is subject to the same TRANSFER_ROLE and pause checks as transfer
+     * @param recipients Addresses receiving veNUTS
+     * @param amounts Amount of veNUTS sent to each recipient
+     */
+    function transferBatch(address[] calldata recipients, uint256[] calldata amounts) external {
+        require(recipients.length == amounts.length, "veNUTS: Length mismatch");
+        for (uint256 i = 0; i < recipients.length; i++) {
+            _transfer(msg.sender, recipients[i], amounts[i]);
+        }
+    }
+
+    /**
+     * @notice Balances of several accounts in one call, e.g. for ScheduledVesting.setSchedules
+     * @param accounts Addresses to read
+     */
+    function balancesOf(address[] calldata accounts) external view returns (uint256[] memory balances) {
+        balances = new uint256[](accounts.length);
+        for (uint256 i = 0; i < accounts.length; i++) {
+            balances[i] = balanceOf(accounts[i]);
+        }
+    }
+
     /**
      * @notice Toggles the token transfer lock
      * @param _tokenLocked Boolean value indicating the desired state
@@ -151,17 +151,16 @@ contract LinearVesting is AccessControl {
         }
 
         uint256 elapsedTime = block.timestamp - vestingInfo.startTimestamp;
+        claimableAmount = _vestedAmount(elapsedTime, vestingInfo.esnutDeposited) - vestingInfo.esnutCollected;
         if (elapsedTime >= VESTING_DURATION) {
-            claimableAmount = vestingInfo.esnutDeposited - vestingInfo.esnutCollected;
             delete vestingSchedules[msg.sender];
         } else {
-            uint256 vestedAmount = (elapsedTime * vestingInfo.esnutDeposited) / VESTING_DURATION;
-            claimableAmount = vestedAmount - vestingInfo.esnutCollected;
             vestingInfo.esnutCollected += uint96(claimableAmount);
         }
 
-        esnutToken.unlock(address(this), claimableAmount);
-        nutToken.transfer(msg.sender, claimableAmount);
+        if (claimableAmount > 0) {
+            esnutToken.unlockTo(address(this), msg.sender, claimableAmount);
+        }
                 
         emit LinearUnlocked(msg.sender, claimableAmount);
     }
@@ -210,17 +209,14 @@ contract LinearVesting is AccessControl {
         require(vestingInfo.startTimestamp + VESTING_DURATION > block.timestamp, "LinearVesting: Vesting complete, no early withdrawal available");
         claimVestedTokens();
         
-        // Penalty is linear from 100% to 0% over the VESTING_DURATION, with a minimum of minPenalty% penalty
         uint256 elapsedTime = block.timestamp - vestingInfo.startTimestamp;
-        uint256 penaltyPercentage = 1e18 - elapsedTime * 1e18 / VESTING_DURATION;
-        if (penaltyPercentage < minPenalty) penaltyPercentage = minPenalty;
-        
         uint256 esnutRemaining = vestingInfo.esnutDeposited - vestingInfo.esnutCollected;
-        penaltyAmount = penaltyPercentage * esnutRemaining / 1e18;
+        penaltyAmount = _penaltyPercentage(elapsedTime) * esnutRemaining / 1e18;
         refundAmount = esnutRemaining - penaltyAmount;
     
-        esnutToken.unlock(address(this), refundAmount);    
-        nutToken.transfer(msg.sender, refundAmount);
+        if (refundAmount > 0) {
+            esnutToken.unlockTo(address(this), msg.sender, refundAmount);
+        }
         
         delete vestingSchedules[msg.sender];
         
@@ -229,12 +225,81 @@ contract LinearVesting is AccessControl {
         emit EarlyLinearUnlock(msg.sender, refundAmount, penaltyAmount);
     }
     
+    /**
+     * @notice NUT that claimVestedTokens would pay an account now
+     * @param account The address of the user
+     */
+    function claimable(address account) public view returns (uint256) {
+        VestingInfo memory vestingInfo = vestingSchedules[account];
+        if (vestingInfo.esnutDeposited == 0) {
+            return 0;
+        }
+        return _vestedAmount(block.timestamp - vestingInfo.startTimestamp, vestingInfo.esnutDeposited) - vestingInfo.esnutCollected;
+    }
+
+    /**
+     * @notice Penalty and refund of an earlyWithdraw by an account now, on top of the claimable amount it pays first
+     * @param account The address of the user
+     * @return penaltyAmount The amount of esNUT tokens that would be penalized, 0 if no early withdrawal is available
+     * @return refundAmount The amount of esNUT tokens that would be returned to the user after penalty
+     */
+    function previewEarlyWithdraw(address account) public view returns (uint256 penaltyAmount, uint256 refundAmount) {
+        VestingInfo memory vestingInfo = vestingSchedules[account];
+        uint256 elapsedTime = block.timestamp - vestingInfo.startTimestamp;
+        if (vestingInfo.esnutDeposited == 0 || elapsedTime >= VESTING_DURATION) {
+            return (0, 0);
+        }
+        uint256 esnutRemaining = vestingInfo.esnutDeposited - _vestedAmount(elapsedTime, vestingInfo.esnutDeposited);
+        penaltyAmount = _penaltyPercentage(elapsedTime) * esnutRemaining / 1e18;
+        refundAmount = esnutRemaining - penaltyAmount;
+    }
+
+    // esNUT of a deposit vested after elapsedTime
+    function _vestedAmount(uint256 elapsedTime, uint256 esnutDeposited) internal pure returns (uint256) {
+        if (elapsedTime >= VESTING_DURATION) return esnutDeposited;
+        return (elapsedTime * esnutDeposited) / VESTING_DURATION;
+    }
+
+    // Penalty is linear from 100% to 0% over the VESTING_DURATION, with a minimum of minPenalty% penalty
+    function _penaltyPercentage(uint256 elapsedTime) internal view returns (uint256 penaltyPercentage) {
+        penaltyPercentage = 1e18 - elapsedTime * 1e18 / VESTING_DURATION;
+        if (penaltyPercentage < minPenalty) penaltyPercentage = minPenalty;
+    }
+
     /**
      * @notice Allows ADMIN to set a future timestamp when an address can start vesting their tokens
      * @param timestamp The future timestamp
      * @param esnutLocked The amount of esNUT tokens that will be locked until the timestamp
      */
     function overrideLockEndTime(address target, uint64 timestamp, uint256 esnutLocked) external onlyRole(DEFAULT_ADMIN_ROLE) {
+        _overrideLockEndTime(target, timestamp, esnutLocked);
+    }
+
+    /**
+     * @notice Batch version of overrideLockEndTime, for onboarding a cohort of accounts in one transaction
+     * @param targets The addresses to lock
+     * @param timestamps The future timestamp of each address
+     * @param esnutLocked The amount of esNUT tokens locked for each address
+     */
+    function overrideLockEndTimes(address[] calldata targets, uint64[] calldata timestamps, uint256[] calldata esnutLocked) external onlyRole(DEFAULT_ADMIN_ROLE) {
+        require(targets.length == timestamps.length && targets.length == esnutLocked.length, "LinearVesting: Length mismatch");
+        for (uint256 i = 0; i < targets.length; i++) {
+            _overrideLockEndTime(targets[i], timestamps[i], esnutLocked[i]);
+        }
+    }
+
+    /**
+     * @notice Lock details of several accounts in one call, e.g. for ScheduledVesting.setSchedules
+     * @param accounts The addresses to read
+     */
+    function lockSchedulesOf(address[] calldata accounts) external view returns (LockInfo[] memory locks) {
+        locks = new LockInfo[](accounts.length);
+        for (uint256 i = 0; i < accounts.length; i++) {
+            locks[i] = lockSchedules[accounts[i]];
+        }
+    }
+
+    function _overrideLockEndTime(address target, uint64 timestamp, uint256 esnutLocked) internal {
         require(uint256(timestamp) > block.timestamp, "LinearVesting: Timestamp should be in the future");
         
         LockInfo storage lockInfo = lockSchedules[target];
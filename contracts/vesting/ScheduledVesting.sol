@@ -20,7 +20,22 @@ contract ScheduledVesting is AccessControl {
         uint256 timestampAvailable;  // Timestamp when the tokens become available
         uint256 amount;              // Amount of tokens to unlock
     }
-    mapping(address => VestingSchedule[]) public schedules;
+
+    /// @dev Stored form of a VestingSchedule entry, one storage slot.
+    struct PackedSchedule {
+        uint64 timestampAvailable;
+        uint128 amount;              // The NUT cap is 1e28
+    }
+
+    /// @dev Position of an account in its schedule. Entries before next are vested.
+    struct ScheduleCursor {
+        uint128 next;
+        uint128 length;
+    }
+
+    // Entries of a schedule are at indices [0, length) and are overwritten in place by the next schedule
+    mapping(address => mapping(uint256 => PackedSchedule)) private scheduleEntries;
+    mapping(address => ScheduleCursor) public scheduleCursors;
 
     esNUT public esnutToken;
     LinearVesting public linearVesting;
@@ -44,6 +59,34 @@ contract ScheduledVesting is AccessControl {
      * @param newSchedule Array of VestingSchedule struct detailing the vesting schedule.
      */
     function setSchedule(address account, VestingSchedule[] calldata newSchedule) external onlyRole(DEFAULT_ADMIN_ROLE) {
+        (uint64 lockDuration, uint64 lockedUntilTimestamp, uint128 esnutLocked) = linearVesting.lockSchedules(account);
+        _setSchedule(account, newSchedule, LinearVesting.LockInfo(lockDuration, lockedUntilTimestamp, esnutLocked), esnutToken.balanceOf(account));
+    }
+
+    /**
+     * @notice Sets the vesting schedules of several accounts, for onboarding a cohort in one transaction.
+     * @dev Can only be called by an account with the DEFAULT_ADMIN_ROLE. Every schedule is validated as in setSchedule.
+     * Lock schedules and esNUT balances of the whole batch are read with one call each instead of two calls per account.
+     * @param accounts Addresses of the users.
+     * @param newSchedules Vesting schedule of each user.
+     */
+    function setSchedules(address[] calldata accounts, VestingSchedule[][] calldata newSchedules) external onlyRole(DEFAULT_ADMIN_ROLE) {
+        require(accounts.length == newSchedules.length, "ScheduledVesting: Length mismatch");
+        LinearVesting.LockInfo[] memory locks = linearVesting.lockSchedulesOf(accounts);
+        uint256[] memory balances = esnutToken.balancesOf(accounts);
+        for (uint256 i = 0; i < accounts.length; i++) {
+            uint256 vested = _setSchedule(accounts[i], newSchedules[i], locks[i], balances[i]);
+            // An account repeated later in the batch is checked against its balance after this unlock
+            if (vested > 0) {
+                for (uint256 j = i + 1; j < accounts.length; j++) {
+                    if (accounts[j] == accounts[i]) balances[j] -= vested;
+                }
+            }
+        }
+    }
+
+    // lockInfo and esnutBalance are the account's LinearVesting lock and esNUT balance, read by the caller
+    function _setSchedule(address account, VestingSchedule[] calldata newSchedule, LinearVesting.LockInfo memory lockInfo, uint256 esnutBalance) internal returns (uint256 vested) {
         require(newSchedule.length > 0, "ScheduledVesting: Schedule length must be greater than 0");
 
         // Check that the schedule is in timestamp-sequential order, and sum all tokens to be vested
@@ -55,23 +98,23 @@ contract ScheduledVesting is AccessControl {
         totalAmount += newSchedule[newSchedule.length - 1].amount;
 
         // Check admin has properly initialised 
-        (uint64 lockDuration, uint64 lockedUntilTimestamp, uint128 esnutLocked) = linearVesting.lockSchedules(account);
-        
-        require(lockedUntilTimestamp > 0, "ScheduledVesting: Lock schedule not set");
-        require(lockedUntilTimestamp >= newSchedule[newSchedule.length - 1].timestampAvailable, "ScheduledVesting: Lock schedule not long enough");
-        require(uint256(lockedUntilTimestamp) > block.timestamp, "ScheduledVesting: Lock schedule already expired");
-        require(lockDuration == 0, "ScheduledVesting: Lock schedule in LinearVesting not set via by ADMIN");
-        require(uint256(esnutLocked) == totalAmount, "ScheduledVesting: lockSchedule esNUT mismatch proposed schedule");
-        require(esnutToken.balanceOf(account) >= totalAmount, "ScheduledVesting: Insufficient esNUT to lock");
+        require(lockInfo.lockedUntilTimestamp > 0, "ScheduledVesting: Lock schedule not set");
+        require(lockInfo.lockedUntilTimestamp >= newSchedule[newSchedule.length - 1].timestampAvailable, "ScheduledVesting: Lock schedule not long enough");
+        require(uint256(lockInfo.lockedUntilTimestamp) > block.timestamp, "ScheduledVesting: Lock schedule already expired");
+        require(lockInfo.lockDuration == 0, "ScheduledVesting: Lock schedule in LinearVesting not set via by ADMIN");
+        require(uint256(lockInfo.esnutLocked) == totalAmount, "ScheduledVesting: lockSchedule esNUT mismatch proposed schedule");
+        require(esnutBalance >= totalAmount, "ScheduledVesting: Insufficient esNUT to lock");
         
         // Vest tokens according to existing schedule before updating
-        vestTokens(account);
+        vested = vestTokens(account);
       
-        // Clear and update the schedule
-        delete schedules[account];
+        // Overwrite the schedule in place, stale entries past the new length are never read.
+        // Timestamps are bounded by the uint64 lockedUntilTimestamp and amounts by the uint128 esnutLocked checked above.
+        mapping(uint256 => PackedSchedule) storage entries = scheduleEntries[account];
         for (uint256 i = 0; i < newSchedule.length; i++) {
-            schedules[account].push(newSchedule[i]);
+            entries[i] = PackedSchedule(uint64(newSchedule[i].timestampAvailable), uint128(newSchedule[i].amount));
         }
+        scheduleCursors[account] = ScheduleCursor(0, uint128(newSchedule.length));
     }
 
     /**
@@ -80,12 +123,46 @@ contract ScheduledVesting is AccessControl {
      * @param account Address of the user.
      */
     function cancelSchedule(address account) external onlyRole(DEFAULT_ADMIN_ROLE) {
-        require(schedules[account].length > 0, "ScheduledVesting: No schedule set for account");
+        require(scheduleCursors[account].length > 0, "ScheduledVesting: No schedule set for account");
 
         // Fulfill existing schedule
         vestTokens(account);
 
-        delete schedules[account];
+        delete scheduleCursors[account];
+    }
+
+    /**
+     * @notice Returns an entry of the current schedule of an account. Vested entries have a zero amount.
+     * @param account Address of the user.
+     * @param index Index of the entry in the schedule.
+     */
+    function schedules(address account, uint256 index) external view returns (uint256 timestampAvailable, uint256 amount) {
+        ScheduleCursor memory cursor = scheduleCursors[account];
+        require(index < cursor.length, "ScheduledVesting: Index out of bounds");
+        PackedSchedule memory entry = scheduleEntries[account][index];
+        return (entry.timestampAvailable, index < cursor.next ? 0 : entry.amount);
+    }
+
+    /**
+     * @notice Summary of the current schedule of an account, read in one call instead of entry by entry.
+     * @param account Address of the user.
+     * @return vestable Amount vestTokens would unlock now.
+     * @return remaining Amount of every entry not vested yet, vestable included.
+     * @return nextTimestamp Timestamp of the first entry not due yet, 0 if there is none.
+     * @return nextAmount Amount of that entry.
+     */
+    function scheduleStatus(address account) external view returns (uint256 vestable, uint256 remaining, uint256 nextTimestamp, uint256 nextAmount) {
+        ScheduleCursor memory cursor = scheduleCursors[account];
+        mapping(uint256 => PackedSchedule) storage entries = scheduleEntries[account];
+        for (uint256 i = cursor.next; i < cursor.length; i++) {
+            PackedSchedule memory entry = entries[i];
+            if (block.timestamp >= entry.timestampAvailable) {
+                vestable += entry.amount;
+            } else if (nextTimestamp == 0) {
+                (nextTimestamp, nextAmount) = (entry.timestampAvailable, entry.amount);
+            }
+            remaining += entry.amount;
+        }
     }
 
     /**
@@ -94,13 +171,17 @@ contract ScheduledVesting is AccessControl {
      * @return totalVested The total number of tokens that were vested.
      */
     function vestTokens(address account) public returns (uint256 totalVested) {
-        VestingSchedule[] storage userSchedule = schedules[account];
-        for (uint256 i = 0; i < userSchedule.length; i++) {
-            if (block.timestamp >= userSchedule[i].timestampAvailable && userSchedule[i].amount > 0) {
-                totalVested += userSchedule[i].amount;
-                userSchedule[i].amount = 0; // Mark as vested
-            }
+        // Timestamps are sequential, so the vested entries are a prefix and the scan stops at the first one not due
+        ScheduleCursor memory cursor = scheduleCursors[account];
+        mapping(uint256 => PackedSchedule) storage entries = scheduleEntries[account];
+        uint256 next = cursor.next;
+        while (next < cursor.length) {
+            PackedSchedule memory entry = entries[next];
+            if (block.timestamp < entry.timestampAvailable) break;
+            totalVested += entry.amount;
+            next++;
         }
+        if (next != cursor.next) scheduleCursors[account].next = uint128(next);
         if (totalVested > 0) {
           esnutToken.unlock(account, totalVested);
           emit ScheduledUnlock(account, totalVested);
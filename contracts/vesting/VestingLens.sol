@@ -0,0 +1,66 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.19;
+
+import "./LinearVesting.sol";
+import "./ScheduledVesting.sol";
+
+/**
+ * @title VestingLens
+ * @notice Read-only batch view of the LinearVesting and ScheduledVesting position of many accounts, for the front-end.
+ * @dev Amounts come from the views of the vesting contracts (claimable, previewEarlyWithdraw, scheduleStatus), so they
+ * match what the corresponding transactions would pay in the current block. Nothing is stored, so one lens serves
+ * every deployment; scripts/vestingLens.py splits large account lists into calls within a node's eth_call gas limit.
+ */
+contract VestingLens {
+    struct VestingStatus {
+        address account;
+        uint256 esnutBalance;          // esNUT held by the account
+        uint256 vestingStart;          // Start of the current LinearVesting period
+        uint256 esnutVesting;          // esNUT in LinearVesting not paid out yet, claimable included
+        uint256 claimable;             // NUT claimVestedTokens would pay now
+        uint256 earlyWithdrawPenalty;  // esNUT earlyWithdraw would send to the fee collector now
+        uint256 earlyWithdrawRefund;   // NUT earlyWithdraw would pay on top of claimable
+        uint256 lockedUntil;           // End of the LinearVesting lock, 0 if never locked
+        uint256 esnutLocked;
+        bool locked;                   // Lock still in force
+        bool adminLock;                // Lock set by ADMIN through overrideLockEndTime
+        uint256 scheduleVestable;      // esNUT vestTokens would unlock now
+        uint256 scheduleRemaining;     // esNUT of the schedule not vested yet, vestable included
+        uint256 nextTrancheTimestamp;  // First schedule entry not due yet, 0 if there is none
+        uint256 nextTrancheAmount;
+    }
+
+    /**
+     * @notice Vesting, lock and schedule status of every account.
+     * @param linearVesting The LinearVesting contract.
+     * @param scheduledVesting The ScheduledVesting contract, or the zero address to skip schedules.
+     * @param accounts Accounts to read.
+     */
+    function getVestingStatus(LinearVesting linearVesting, ScheduledVesting scheduledVesting, address[] calldata accounts) external view returns (VestingStatus[] memory result) {
+        esNUT esnut = linearVesting.esnutToken();
+        result = new VestingStatus[](accounts.length);
+        for (uint256 i = 0; i < accounts.length; i++) {
+            VestingStatus memory status = result[i];
+            status.account = accounts[i];
+            status.esnutBalance = esnut.balanceOf(accounts[i]);
+            _linearStatus(linearVesting, status);
+            if (address(scheduledVesting) != address(0)) {
+                (status.scheduleVestable, status.scheduleRemaining, status.nextTrancheTimestamp, status.nextTrancheAmount) = scheduledVesting.scheduleStatus(accounts[i]);
+            }
+        }
+    }
+
+    function _linearStatus(LinearVesting linearVesting, VestingStatus memory status) internal view {
+        (uint64 startTimestamp, uint96 esnutDeposited, uint96 esnutCollected) = linearVesting.vestingSchedules(status.account);
+        status.vestingStart = startTimestamp;
+        status.esnutVesting = esnutDeposited - esnutCollected;
+        status.claimable = linearVesting.claimable(status.account);
+        (status.earlyWithdrawPenalty, status.earlyWithdrawRefund) = linearVesting.previewEarlyWithdraw(status.account);
+
+        (uint64 lockDuration, uint64 lockedUntilTimestamp, uint128 esnutLocked) = linearVesting.lockSchedules(status.account);
+        status.lockedUntil = lockedUntilTimestamp;
+        status.esnutLocked = esnutLocked;
+        status.locked = block.timestamp < lockedUntilTimestamp;
+        status.adminLock = lockDuration == 0 && lockedUntilTimestamp > 0;
+    }
+}
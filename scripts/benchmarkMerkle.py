@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+# Offline benchmark of the distribution pipeline on synthetic address,amount lists.
+# Run from the repository root:  python3 -m scripts.benchmarkMerkle --sizes 1000 100000 --out bench.jsonl
+# Each size runs in a fresh process, so peak RSS (ru_maxrss of that process, hashing workers excluded)
+# is per size. One JSON line per size is appended to --out.
+
+import os, json, time, random, argparse, platform, resource, tempfile, subprocess, contextlib, io
+import multiprocessing
+from scripts.merkle import readRows, hashRows, buildTree, getProof, MerkleTree
+
+SIZES = [1000, 10000, 100000, 1000000, 5000000]
+
+def writeSyntheticList(FN, size, seed):
+  rng = random.Random(seed)
+  with open(FN, "w") as f:
+    for i in range(size):
+      f.write("0x%040x,%i\n"%(rng.getrandbits(160), rng.randrange(1, 10**24)))
+
+def runSize(size, jobs, seed, queue):
+  result = {"size": size, "jobs": jobs}
+  with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+    FN = os.path.join(tmp, "list.csv")
+    writeSyntheticList(FN, size, seed)
+    pool = multiprocessing.Pool(jobs) if jobs > 1 else None
+    try:
+      t = time.perf_counter()
+      leafHashes = hashRows(readRows(FN), pool, jobs)
+      result["leafHashing"] = time.perf_counter() - t
+
+      t = time.perf_counter()
+      levels = buildTree(leafHashes, pool, jobs)
+      result["levelBuilding"] = time.perf_counter() - t
+    finally:
+      if pool is not None: pool.close()
+
+    t = time.perf_counter()
+    for i in range(size): getProof(levels, i)
+    result["proofExtraction"] = time.perf_counter() - t
+
+    tree = MerkleTree(levels, size)
+    t = time.perf_counter()
+    tree.writeBin(FN + ".proofTree.bin")
+    result["serializeBin"] = time.perf_counter() - t
+    t = time.perf_counter()
+    tree.writeJSON(FN)
+    result["serializeJSON"] = time.perf_counter() - t
+
+    result["treeBytes"] = sum(len(level) for level in levels)
+    result["jsonBytes"] = os.path.getsize(FN + ".proof.json") + os.path.getsize(FN + ".proofTree.json")
+  result["peakRSS"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # kB on Linux
+  queue.put(result)
+
+def gitCommit():
+  try: return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr = subprocess.DEVNULL).decode().strip()
+  except Exception: return None
+
+def main():
+  parser = argparse.ArgumentParser(description = "Benchmark Merkle tree generation on synthetic lists, fully offline")
+  parser.add_argument("--sizes", type = int, nargs = "+", default = SIZES)
+  parser.add_argument("-j", "--jobs", type = int, default = os.cpu_count())
+  parser.add_argument("--seed", type = int, default = 0)
+  parser.add_argument("--out", default = "bench_merkle.jsonl")
+  args = parser.parse_args()
+
+  meta = {"time": int(time.time()), "commit": gitCommit(), "python": platform.python_version(), "cpus": os.cpu_count()}
+  ctx = multiprocessing.get_context("spawn")
+  for size in args.sizes:
+    queue = ctx.Queue()
+    p = ctx.Process(target = runSize, args = (size, args.jobs, args.seed, queue))
+    p.start()
+    result = queue.get()
+    p.join()
+    result.update(meta)
+    print(json.dumps(result))
+    with open(args.out, "a") as f: f.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,159 @@
+import json, time
+from concurrent.futures import ThreadPoolExecutor
+from brownie import web3
+from brownie.exceptions import VirtualMachineError
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from scripts.claimStatus import claimedBitmap, isClaimedIn
+
+# Pushes claims of sponsored distributions through MultiClaim.multiClaim on behalf of the recipients.
+#   claims = loadClaims(m, "scripts/WEEK.proof.json")
+#   report = relay(claims, multiclaim, sender)
+# Claims already claimed on-chain are dropped first, from the claimed bitmap. The rest is packed into batches
+# sized to gasBudget with a per-claim gas model calibrated by estimate_gas on the first claims. Every batch of a
+# round is sent back to back with consecutive nonces, without waiting for receipts, and the receipts are then
+# awaited concurrently. A failed batch is re-filtered and split in two for the next round, so a single bad claim
+# ends up alone and is reported instead of blocking the others. A batch whose receipt times out is settled
+# before it is retried: its nonce is replaced by a 0-value transfer at a higher fee, and the batch counts as
+# mined if the original transaction won. If neither mines, later nonces cannot go through either, so relaying
+# stops and the nonce is reported in stuckNonce.
+
+GAS_BUDGET = 8000000        # Gas limit of one multiClaim transaction
+GAS_MARGIN = 1.2            # Headroom over the gas model, covering deeper proofs and first-time recipients
+CALIBRATION_CLAIMS = 8
+DEFAULT_CLAIM_GAS = (30000, 80000)  # (base, per claim) when calibration fails
+RECEIPT_WORKERS = 16
+RECEIPT_TIMEOUT = 600
+REPLACEMENT_BUMP = 1.125    # Nodes accept a replacement paying at least 10% more
+NONCE_POLL = 2
+
+def loadClaims(m, FN):
+  # (distributor, index, addr, amt, proof) of every leaf of a .proof.json written by generateFromJSON.generate
+  return sorted(((m, v["index"], addr, int(v["week_incentive"]), v["proof"]) for addr, v in json.load(open(FN)).items()), key = lambda c: c[1])
+
+def _param(claim):
+  m, index, addr, amt, proof = claim
+  return (m.address, index, addr, amt, proof)
+
+def unclaimed(claims):
+  # Drops claims already claimed, reading the claimed bitmap of each distributor once. Distributors deployed
+  # before claimedWords existed are read with one isClaimed call per claim.
+  byDistributor = {}
+  for claim in claims: byDistributor.setdefault(claim[0].address, []).append(claim)
+  result = []
+  for group in byDistributor.values():
+    m = group[0][0]
+    try:
+      words = claimedBitmap(m, max(c[1] for c in group) + 1)[0] if hasattr(m, "claimedWords") else None
+    except VirtualMachineError:
+      words = None
+    if words is None: result += [c for c in group if not m.isClaimed(c[1])]
+    else: result += [c for c in group if not isClaimedIn(words, c[1])]
+  return result
+
+def gasModel(multiclaim, claims, sender):
+  # (base, perClaim) gas of multiClaim, from estimates of one claim and of up to CALIBRATION_CLAIMS claims
+  sample = claims[:CALIBRATION_CLAIMS]
+  try:
+    one = multiclaim.multiClaim.estimate_gas([_param(c) for c in sample[:1]], {"from": sender})
+    if len(sample) == 1: return DEFAULT_CLAIM_GAS[0], max(one - DEFAULT_CLAIM_GAS[0], 1)
+    many = multiclaim.multiClaim.estimate_gas([_param(c) for c in sample], {"from": sender})
+  except Exception:
+    return DEFAULT_CLAIM_GAS
+  perClaim = max((many - one) // (len(sample) - 1), 1)
+  return max(one - perClaim, 0), perClaim
+
+def packBatches(claims, model, gasBudget):
+  base, perClaim = model
+  size = max(1, int((gasBudget / GAS_MARGIN - base) // perClaim))
+  return [claims[start:start + size] for start in range(0, len(claims), size)]
+
+def _gasLimit(batch, model, gasBudget):
+  base, perClaim = model
+  return min(gasBudget, int((base + perClaim * len(batch)) * GAS_MARGIN))
+
+def _submit(multiclaim, batches, sender, model, gasBudget):
+  # Sends every batch with consecutive nonces, returns [(batch, txid or None, nonce)]
+  nonce = web3.eth.get_transaction_count(sender.address, "pending")
+  sent = []
+  for batch in batches:
+    try:
+      tx = multiclaim.multiClaim([_param(c) for c in batch], {"from": sender, "nonce": nonce, "gas_limit": _gasLimit(batch, model, gasBudget), "required_confs": 0})
+      sent.append((batch, tx.txid, nonce))
+      nonce += 1
+    except Exception as e:
+      # Rejected by the node; whether the nonce was used depends on the node, so read it again
+      sent.append((batch, getattr(e, "txid", None), nonce))
+      nonce = web3.eth.get_transaction_count(sender.address, "pending")
+  return sent
+
+def _wait(txid):
+  # Receipt of txid, None if it was never sent or is not mined within RECEIPT_TIMEOUT
+  if txid is None: return None
+  try:
+    return web3.eth.wait_for_transaction_receipt(txid, timeout = RECEIPT_TIMEOUT)
+  except TimeExhausted:
+    return None
+
+def _receipts(sent):
+  # Waits for all receipts concurrently, returns [(batch, txid, nonce, receipt or None)]
+  with ThreadPoolExecutor(RECEIPT_WORKERS) as pool:
+    return [(batch, txid, nonce, receipt) for (batch, txid, nonce), receipt in zip(sent, pool.map(_wait, [txid for batch, txid, nonce in sent]))]
+
+def _replacementFees(txid):
+  # Fees outbidding the pending transaction txid, or the current gas price if the node dropped it
+  try:
+    tx = web3.eth.get_transaction(txid)
+  except TransactionNotFound:
+    return {"gas_price": web3.eth.gas_price}
+  bump = lambda fee: int(fee * REPLACEMENT_BUMP) + 1
+  if tx.get("maxFeePerGas") is not None: return {"max_fee": bump(tx["maxFeePerGas"]), "priority_fee": bump(tx["maxPriorityFeePerGas"])}
+  return {"gas_price": bump(tx["gasPrice"])}
+
+def _settle(sender, txid, nonce):
+  # Replaces the timed-out transaction txid at nonce with a 0-value transfer and waits until the nonce is mined.
+  # Returns (receipt of txid if it won the nonce, else None; False if the nonce is still pending)
+  try:
+    sender.transfer(sender, 0, gas_limit = 21000, nonce = nonce, required_confs = 0, silent = True, **_replacementFees(txid))
+  except Exception:
+    pass  # Typically "nonce too low": the original was mined in the meantime
+  deadline = time.time() + RECEIPT_TIMEOUT
+  while web3.eth.get_transaction_count(sender.address, "latest") <= nonce:
+    if time.time() > deadline: return None, False
+    time.sleep(NONCE_POLL)
+  try:
+    return web3.eth.get_transaction_receipt(txid), True
+  except TransactionNotFound:
+    return None, True
+
+def relay(claims, multiclaim, sender, gasBudget = GAS_BUDGET):
+  # Returns {"claimed", "alreadyClaimed", "failed", "txs", "gasUsed", "rounds", "stuckNonce"}
+  claims = list(claims)
+  pending = unclaimed(claims)
+  report = {"claimed": [], "alreadyClaimed": len(claims) - len(pending), "failed": [], "txs": [], "gasUsed": 0, "rounds": 0, "stuckNonce": None}
+  if len(pending) == 0: return report
+  model = gasModel(multiclaim, pending, sender)
+  batches = packBatches(pending, model, gasBudget)
+  while len(batches) > 0:
+    report["rounds"] += 1
+    retry = []
+    for batch, txid, nonce, receipt in _receipts(_submit(multiclaim, batches, sender, model, gasBudget)):
+      if receipt is None and txid is not None and report["stuckNonce"] is None:
+        # Timed out: settle its nonce before the batch is split and resent at new nonces
+        receipt, settled = _settle(sender, txid, nonce)
+        if not settled: report["stuckNonce"] = nonce
+      if report["stuckNonce"] is not None and receipt is None:
+        report["failed"] += [c for c in batch if not c[0].isClaimed(c[1])]
+        continue
+      if receipt is not None:
+        report["txs"].append(receipt["transactionHash"].hex())
+        report["gasUsed"] += receipt["gasUsed"]
+      if receipt is not None and receipt["status"] == 1:
+        report["claimed"] += batch
+        continue
+      remaining = [c for c in batch if not c[0].isClaimed(c[1])]
+      report["alreadyClaimed"] += len(batch) - len(remaining)
+      if len(remaining) == 1: report["failed"].append(remaining[0])
+      elif len(remaining) > 1: retry += [remaining[:len(remaining) // 2], remaining[len(remaining) // 2:]]
+    batches = retry if report["stuckNonce"] is None else []
+  if report["stuckNonce"] is not None: report["failed"] += [c for batch in retry for c in batch]
+  return report
@@ -0,0 +1,49 @@
+import json
+
+# Claim status of a whole distribution from MerkleDistributor.claimedWords, reading WORD_BATCH bitmap words
+# (256 indices each) per call instead of one isClaimed call per index. A 1M-leaf distribution is 3907 words,
+# a single call of ~10M gas.
+# In the brownie console: claimStatus(m, claimsFromProofJSON("scripts/WEEK.proof.json"))
+
+WORD_BATCH = 4096
+
+def claimedBitmap(m, leafCount, batchSize = WORD_BATCH):
+  # (words, claimedCount) covering indices 0 to leafCount - 1
+  words, claimedCount = [], 0
+  wordCount = (leafCount + 255) // 256
+  for start in range(0, wordCount, batchSize):
+    batch, count = m.claimedWords(start, min(batchSize, wordCount - start))
+    words.extend(int(word) for word in batch)
+    claimedCount += count
+  return words, claimedCount
+
+def isClaimedIn(words, index):
+  return (words[index // 256] >> (index % 256)) & 1 == 1
+
+def claimedIndices(words):
+  # Set of claimed indices, visiting set bits only
+  result = set()
+  for w, word in enumerate(words):
+    while word:
+      low = word & -word
+      result.add(w * 256 + low.bit_length() - 1)
+      word ^= low
+  return result
+
+def claimsFromRows(rows):
+  # (index, addr, amt) of the (addr, amt) rows of a list, in leaf order as given to generateTree
+  return [(i, addr, int(amt)) for i, (addr, amt) in enumerate(rows)]
+
+def claimsFromProofJSON(FN):
+  # (index, addr, amt) of a .proof.json written by generateFromJSON.generate
+  return sorted((v["index"], addr, int(v["week_incentive"])) for addr, v in json.load(open(FN)).items())
+
+def claimStatus(m, claims, batchSize = WORD_BATCH):
+  # Joins the bitmap against the (index, addr, amt) claims of the distribution:
+  # {"claimed": [...], "unclaimed": [...], "claimedAmount", "unclaimedAmount", "claimedCount"}
+  claims = list(claims)
+  words, claimedCount = claimedBitmap(m, max((i for i, addr, amt in claims), default = -1) + 1, batchSize)
+  claimed = [c for c in claims if isClaimedIn(words, c[0])]
+  unclaimed = [c for c in claims if not isClaimedIn(words, c[0])]
+  return {"claimed": claimed, "unclaimed": unclaimed, "claimedCount": claimedCount,
+          "claimedAmount": sum(amt for i, addr, amt in claimed), "unclaimedAmount": sum(amt for i, addr, amt in unclaimed)}
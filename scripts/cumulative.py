@@ -0,0 +1,28 @@
+import json
+
+# Cumulative trees for CumulativeMerkleDistributor. Each round's tree holds, for every account, the sum of its
+# week_incentive over all weekly JSON files so far. Accounts keep the leaf index of their first appearance and
+# new accounts are appended, so a round only touches the leaves of accounts paid that week and the cached
+# rebuild of generateTree rehashes little.
+
+def cumulativeRows(weeks):
+  # weeks are the weekly {address: {"week_incentive": amount}} dicts in order, returns (addr, total) in leaf order
+  totals, spelling = {}, {}
+  for week in weeks:
+    for addr, v in week.items():
+      key = addr.lower()
+      if key not in totals: totals[key], spelling[key] = 0, addr
+      totals[key] += int(v["week_incentive"])
+  return [(spelling[key], total) for key, total in totals.items()]
+
+def loadWeeks(FNs):
+  return [json.load(open(FN)) for FN in FNs]
+
+def previousTotals(FN):
+  # {address (lowercase): cumulative amount} of a round published as <name>.proof.json by generateCumulative
+  return {addr.lower(): int(v["cumulative"]) for addr, v in json.load(open(FN)).items()}
+
+def checkMonotonic(rows, previous):
+  # Accounts whose cumulative amount would go down from the previous round, which would block their claims
+  totals = {addr.lower(): total for addr, total in rows}
+  return [addr for addr, total in previous.items() if totals.get(addr, 0) < total]
@@ -0,0 +1,20 @@
+from brownie import web3, MerkleDistributorClone
+
+# Weekly MerkleDistributors as EIP-1167 clones deployed by MerkleDistributorFactory, instead of a full
+# MerkleDistributor per week.
+#   m = deployClone(factory, token, root, owner, "ARBITRUM_USER_INCENTIVE_DATA_FEB_02_FEB_09", funding, {"from": a[0]})
+# The CREATE2 salt is the keccak256 of the distribution name, so predictDistributor gives the address before
+# deployment (for the proof shards and the claim page) and the same name cannot be deployed twice with one root.
+# A non-zero funding is pulled from the sender, which must have approved it to the factory.
+
+def distributionSalt(name):
+  return web3.keccak(text = name)
+
+def predictDistributor(factory, token, root, owner, name):
+  return factory.predictDistributor(token, root, owner, distributionSalt(name))
+
+def deployClone(factory, token, root, owner, name, funding = 0, tx_params = None):
+  predicted = predictDistributor(factory, token, root, owner, name)
+  tx = factory.createDistributor(token, root, owner, distributionSalt(name), funding, tx_params or {})
+  assert tx.events["DistributorCreated"]["distributor"] == predicted
+  return MerkleDistributorClone.at(predicted)
@@ -0,0 +1,178 @@
+import json, sqlite3
+from web3.exceptions import BlockNotFound
+
+# Local SQLite index of Claimed, vesting, esNUT and governance events, for reporting without polling contract
+# state account by account. Logs are fetched per source in block ranges that shrink when the node rejects a
+# query and grow while results stay small. Each source resumes from its checkpoint, and block hashes of the
+# last REORG_DEPTH indexed blocks are kept, so a reorg rolls back every event above the common ancestor.
+#
+# In the brownie console:
+#   indexer = EventIndexer(web3, openEventDB(), {"week1": (m, MERKLE_EVENTS), "vesting": (linearVesting, LINEAR_VESTING_EVENTS)})
+#   indexer.sync()
+
+EVENT_DB = "scripts/events.sqlite"
+
+MERKLE_EVENTS = ["Claimed"]
+LINEAR_VESTING_EVENTS = ["StartLinearUnlock", "LinearUnlocked", "EarlyLinearUnlock", "CancelLinearUnlock"]
+SCHEDULED_VESTING_EVENTS = ["ScheduledUnlock"]
+ESNUT_EVENTS = ["TokenLock", "DelegateChanged", "DelegateVotesChanged"]
+GOVERNOR_EVENTS = ["ProposalCreated", "VoteCast", "VoteCastWithParams", "ProposalQueued", "ProposalExecuted", "ProposalCanceled"]
+
+# Argument holding the account an event is about, indexed for per-account queries
+ACCOUNT_ARGS = ["account", "voter", "delegator", "delegate", "proposer"]
+
+REORG_DEPTH = 64
+MAX_RANGE = 100000
+TARGET_LOGS = 5000  # Ranges grow while a query returns fewer logs than this
+
+# Messages of the eth_getLogs errors nodes return for a range too wide or too many results (geth, Infura,
+# Alchemy, QuickNode, Ankr, Nethermind, ganache). Any other error is raised instead of retried on a smaller range.
+RANGE_ERRORS = ["returned more than", "too many results", "too many logs", "response size", "block range", "range is too", "range too", "limited to"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+  source      TEXT NOT NULL,
+  blockNumber INTEGER NOT NULL,
+  logIndex    INTEGER NOT NULL,
+  blockHash   TEXT NOT NULL,
+  txHash      TEXT NOT NULL,
+  address     TEXT NOT NULL,
+  event       TEXT NOT NULL,
+  account     TEXT,           -- lowercase, see ACCOUNT_ARGS
+  args        TEXT NOT NULL,  -- JSON, integers as decimal strings
+  PRIMARY KEY (source, blockNumber, logIndex)  -- a log watched by two sources is stored for each
+);
+CREATE INDEX IF NOT EXISTS eventsByAccount ON events (account, event);
+CREATE INDEX IF NOT EXISTS eventsBySource ON events (source, event, blockNumber);
+CREATE TABLE IF NOT EXISTS checkpoints (
+  source    TEXT PRIMARY KEY,
+  address   TEXT NOT NULL,
+  lastBlock INTEGER NOT NULL    -- last block fully indexed for this source
+);
+CREATE TABLE IF NOT EXISTS blocks (
+  number INTEGER PRIMARY KEY,
+  hash   TEXT NOT NULL
+);
+"""
+
+def openEventDB(FN = EVENT_DB):
+  db = sqlite3.connect(FN)
+  db.executescript(SCHEMA)
+  return db
+
+def _toHex(value):
+  # HexBytes, bytes or hex string to a lowercase 0x-prefixed string
+  if isinstance(value, str): return value.lower() if value.startswith("0x") else "0x" + value.lower()
+  return "0x" + bytes(value).hex()
+
+def _isRangeError(e):
+  message = str(e).lower()
+  return any(pattern in message for pattern in RANGE_ERRORS)
+
+def _jsonArg(value):
+  if isinstance(value, bool): return value
+  if isinstance(value, int): return str(value)
+  if isinstance(value, (bytes, bytearray)): return "0x" + bytes(value).hex()
+  if isinstance(value, (list, tuple)): return [_jsonArg(v) for v in value]
+  return value
+
+class EventIndexer:
+  # sources maps a name to (contract, [event names]), the contract being anything with .address and .abi
+  def __init__(self, w3, db, sources, startBlock = 0, maxRange = MAX_RANGE, reorgDepth = REORG_DEPTH, confirmations = 0):
+    self.w3, self.db = w3, db
+    self.startBlock, self.maxRange, self.reorgDepth, self.confirmations = startBlock, maxRange, reorgDepth, confirmations
+    self.sources = {}
+    for name, (contract, events) in sources.items():
+      c = w3.eth.contract(address = contract.address, abi = contract.abi)
+      byTopic = {}
+      for event in events:
+        abi = next(item for item in contract.abi if item.get("type") == "event" and item["name"] == event)
+        signature = "%s(%s)"%(event, ",".join(i["type"] for i in abi["inputs"]))
+        e = getattr(c.events, event)()
+        byTopic[_toHex(w3.keccak(text = signature))] = getattr(e, "process_log", None) or e.processLog
+      self.sources[name] = (contract.address, byTopic)
+      db.execute("INSERT OR IGNORE INTO checkpoints VALUES (?, ?, ?)", (name, contract.address, startBlock - 1))
+    db.commit()
+    self.range = maxRange
+
+  def checkpoint(self, source):
+    return self.db.execute("SELECT lastBlock FROM checkpoints WHERE source = ?", (source,)).fetchone()[0]
+
+  def rollback(self, block):
+    # Forget everything indexed above block
+    with self.db:
+      self.db.execute("DELETE FROM events WHERE blockNumber > ?", (block,))
+      self.db.execute("DELETE FROM blocks WHERE number > ?", (block,))
+      self.db.execute("UPDATE checkpoints SET lastBlock = ? WHERE lastBlock > ?", (block, block))
+
+  def _blockHash(self, number):
+    # None when the chain is now shorter than number, e.g. after a reorg to a shorter chain
+    try:
+      return _toHex(self.w3.eth.get_block(number)["hash"])
+    except BlockNotFound:
+      return None
+
+  def checkReorg(self):
+    # Rolls back to the highest recorded block still on the chain, returns the rollback block or None
+    recorded = self.db.execute("SELECT number, hash FROM blocks ORDER BY number DESC").fetchall()
+    for i, (number, blockHash) in enumerate(recorded):
+      if self._blockHash(number) == blockHash:
+        if i == 0: return None
+        self.rollback(number)
+        return number
+    if len(recorded) == 0: return None
+    # Deeper than every recorded block, start over from before the oldest one
+    self.rollback(recorded[-1][0] - 1)
+    return recorded[-1][0] - 1
+
+  def _getLogs(self, address, topics, fromBlock, toBlock):
+    # Halves the range while the node rejects it as too wide, returns (logs, toBlock actually covered)
+    while True:
+      try:
+        return self.w3.eth.get_logs({"address": address, "topics": [topics], "fromBlock": fromBlock, "toBlock": toBlock}), toBlock
+      except Exception as e:
+        if toBlock == fromBlock or not _isRangeError(e): raise
+        toBlock = fromBlock + (toBlock - fromBlock) // 2
+        self.range = max(1, toBlock - fromBlock + 1)
+
+  def _store(self, source, logs, byTopic):
+    rows = []
+    for log in logs:
+      decoded = byTopic[_toHex(log["topics"][0])](log)
+      args = {k: _jsonArg(v) for k, v in decoded["args"].items()}
+      account = next((args[k].lower() for k in ACCOUNT_ARGS if isinstance(args.get(k), str)), None)
+      rows.append((source, log["blockNumber"], log["logIndex"], _toHex(log["blockHash"]), _toHex(log["transactionHash"]),
+                   log["address"], decoded["event"], account, json.dumps(args)))
+    self.db.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+  def sync(self, toBlock = None):
+    # Indexes every source up to toBlock (default: head minus confirmations), returns the number of events stored
+    self.checkReorg()
+    head = self.w3.eth.block_number - self.confirmations
+    toBlock = head if toBlock is None else min(toBlock, head)
+    stored = 0
+    for source, (address, byTopic) in self.sources.items():
+      fromBlock = self.checkpoint(source) + 1
+      while fromBlock <= toBlock:
+        logs, end = self._getLogs(address, list(byTopic), fromBlock, min(toBlock, fromBlock + self.range - 1))
+        with self.db:
+          self._store(source, logs, byTopic)
+          self.db.execute("UPDATE checkpoints SET lastBlock = ? WHERE source = ?", (end, source))
+          self.db.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?)", (end, _toHex(self.w3.eth.get_block(end)["hash"])))
+          for log in logs: self.db.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?)", (log["blockNumber"], _toHex(log["blockHash"])))
+        stored += len(logs)
+        if len(logs) < TARGET_LOGS // 2: self.range = min(self.maxRange, self.range * 2)
+        fromBlock = end + 1
+    with self.db:
+      self.db.execute("DELETE FROM blocks WHERE number < ?", (toBlock - self.reorgDepth,))
+    return stored
+
+  def events(self, event = None, account = None, source = None):
+    # Stored events as dicts, in chain order
+    query, params = "SELECT source, blockNumber, logIndex, txHash, address, event, args FROM events WHERE 1", []
+    for column, value in [("event", event), ("account", str(account).lower() if account else None), ("source", source)]:
+      if value is not None:
+        query += " AND %s = ?"%column
+        params.append(value)
+    return [{"source": s, "blockNumber": b, "logIndex": i, "txHash": t, "address": a, "event": e, "args": json.loads(args)}
+            for s, b, i, t, a, e, args in self.db.execute(query + " ORDER BY blockNumber, logIndex", params)]
@@ -1,5 +1,11 @@
 import json, sys, os
+from contextlib import closing
 from brownie import *
+from scripts.merkle import generateTree, verifyClaims
+from scripts.proofIndex import openIndex, indexDistribution, indexProofJSON, lookup
+from scripts.proofShards import writeShards
+from scripts.cumulative import cumulativeRows, loadWeeks, previousTotals, checkMonotonic
+from scripts.distributorFactory import predictDistributor, deployClone
 
 owner = accounts.load("owner")
 
@@ -8,6 +14,9 @@ merkleMap = {
   "ARBITRUM_USER_INCENTIVE_DATA_FEB_02_FEB_09.proof.json": "0x8075d95BF16215e356E97eE74A592c675dCc8D65",
 }
 
+# MerkleDistributorFactory weekly distributions are cloned from. None deploys a full MerkleDistributor instead.
+FACTORY = None
+
 
 def generate(FN, TT = False):
 
@@ -18,34 +27,91 @@ def generate(FN, TT = False):
   	print("JSON ndeeded")
   	return
   
-  # Generate CSV
-  FN_CSV = FN[0:-5] + ".csv"
   fn_json = json.load(open("scripts/"+FN))
   csved = [(i, fn_json[i]["week_incentive"]) for i in fn_json]
-  open("scripts/"+FN_CSV, "w").write("\n".join(["%s,%i"%(i[0], i[1]) for i in csved]))
-  
-  os.system("cd scripts; python3 generateProof.py %s"%FN_CSV)
-  proofTree = json.load(open("scripts/"+FN_CSV + ".proofTree.json", "r"))
-  proofs = json.load(open("scripts/"+FN_CSV + ".proof.json", "r"))
-  
-  m = MerkleDistributor.deploy(REWARD_TOKEN, proofTree[-1][0], {"from": a[0]})
   
-  if TT: nut.mint(m, sum(i[1] for i in csved), {"from": owner})
-  print("%i tokens total."%(sum(i[1] for i in csved)))
+  tree = generateTree(csved, os.cpu_count(), "scripts/.merkleCache", FN[0:-5])
+  tree.writeBin("scripts/"+FN[0:-5] + ".proofTree.bin")
   
   for i in range(len(csved)):
       addr, amt = list(csved[i])
       assert fn_json[addr]["week_incentive"] == amt
-      fn_json[addr]["proof"] = proofs[i]
+      fn_json[addr]["proof"] = tree.proof(i)
       fn_json[addr]["index"] = i
       fn_json[addr]["week_incentive"] = str(fn_json[addr]["week_incentive"]) # JSON parsing on browser causes rounding
   
+  # Check every published proof offline before anything is deployed
+  failed = verifyClaims(tree.root(), ((fn_json[addr]["index"], addr, fn_json[addr]["week_incentive"], fn_json[addr]["proof"]) for addr in fn_json), os.cpu_count())
+  if len(failed) > 0:
+    print("%i invalid proofs, first at index %i. Not deploying."%(len(failed), failed[0]))
+    return
+  
+  total = sum(i[1] for i in csved)
+  if FACTORY is not None:
+    # Clone at an address known in advance, funded in the same transaction with the test token
+    factory = MerkleDistributorFactory.at(FACTORY)
+    print("Distributor address: %s"%predictDistributor(factory, REWARD_TOKEN, tree.root(), a[0], FN[0:-5]))
+    if TT:
+      nut.mint(a[0], total, {"from": owner})
+      nut.approve(factory, total, {"from": a[0]})
+    m = deployClone(factory, REWARD_TOKEN, tree.root(), a[0], FN[0:-5], total if TT else 0, {"from": a[0]})
+  else:
+    m = MerkleDistributor.deploy(REWARD_TOKEN, tree.root(), {"from": a[0]})
+    if TT: nut.mint(m, total, {"from": owner})
+  
+  with closing(openIndex()) as db:
+    indexDistribution(db, FN[0:-5], m.address, csved, "scripts/"+FN[0:-5] + ".proofTree.bin")
+  
+  print("%i tokens total."%total)
+  
   if TT:
     for addr in list(fn_json.keys())[0:10]:
          m.claim.call(fn_json[addr]["index"], addr, fn_json[addr]["week_incentive"], fn_json[addr]["proof"], {"from": a[0]})
          print("Sent %i TOKEN to %s"%(int(fn_json[addr]["week_incentive"])/1e18, addr))
   
   json.dump(fn_json, open("scripts/"+FN[0:-5] + ".proof.json", "w"))
+  
+  # Per-wallet bundles for the claim page
+  shards = writeShards("scripts/"+FN[0:-5] + ".shards", tree, csved, distributor = m.address, token = REWARD_TOKEN)
+  print("%i proof shards written."%shards)
+  return m
+
+def generateCumulative(FNs, m = None, TT = False, name = "cumulative"):
+  # One CumulativeMerkleDistributor for all weeks: FNs are every weekly JSON so far, in order.
+  # Deploys the distributor on the first round, otherwise publishes the new root on m.
+  nut = NUT.at("0x9eA2553267c28CC8F68489FEc85d069d5607DCB0")
+  REWARD_TOKEN = "0x9eA2553267c28CC8F68489FEc85d069d5607DCB0" if TT else "0x912ce59144191c1204e64559fe8253a0e49e6548"
+
+  rows = cumulativeRows(loadWeeks(["scripts/" + FN for FN in FNs]))
+  previous = {}
+  if m is not None and os.path.exists("scripts/" + name + ".proof.json"):
+    previous = previousTotals("scripts/" + name + ".proof.json")
+    lowered = checkMonotonic(rows, previous)
+    if len(lowered) > 0:
+      print("%i accounts would get less than in the previous round, first %s. Not publishing."%(len(lowered), lowered[0]))
+      return
+
+  tree = generateTree(rows, os.cpu_count(), "scripts/.merkleCache", name)
+  tree.writeBin("scripts/" + name + ".proofTree.bin")
+  fn_json = {addr: {"cumulative": str(amt), "index": i, "proof": tree.proof(i)} for i, (addr, amt) in enumerate(rows)}
+
+  failed = verifyClaims(tree.root(), ((v["index"], addr, v["cumulative"], v["proof"]) for addr, v in fn_json.items()), os.cpu_count())
+  if len(failed) > 0:
+    print("%i invalid proofs, first at index %i. Not publishing."%(len(failed), failed[0]))
+    return
+
+  if m is None: m = CumulativeMerkleDistributor.deploy(REWARD_TOKEN, tree.root(), {"from": a[0]})
+  else: m.setMerkleRoot(tree.root(), {"from": a[0]})
+
+  # Fund what the new root adds over the previous round, i.e. every week so far on the first round
+  total = sum(i[1] for i in rows)
+  added = total - sum(previous.values())
+  if TT: nut.mint(m, added, {"from": owner})
+  print("Round %i: %i tokens added, %i tokens total."%(m.round(), added, total))
+
+  json.dump(fn_json, open("scripts/" + name + ".proof.json", "w"))
+  shards = writeShards("scripts/" + name + ".shards", tree, rows, distributor = m.address, token = REWARD_TOKEN, cumulative = True, round = m.round())
+  print("%i proof shards written."%shards)
   return m
 
 def test(FN, m):
@@ -55,19 +121,22 @@ def test(FN, m):
        print("Sent %i TOKEN to %s"%(int(fn_json[addr]["week_incentive"])/1e18, addr))
 
 def findProof(addr):
-  proofs = [i for i in os.listdir("scripts/") if i[-11:] == ".proof.json"]
-  for fn in proofs:
-    fn_json = json.load(open("scripts/" + fn))
-    try:
-      if addr in fn_json:
-        print(fn_json[addr])
-        print
-    except:
-      print("Not found in %s"%fn)
-
+  with closing(openIndex()) as db:
+    claims = lookup(db, addr)
+  for claim in claims: print(claim)
+  if len(claims) == 0: print("Not found")
 
+def indexExisting():
+  # Backfill the index with distributions published before it existed
+  with closing(openIndex()) as db:
+    for fn in merkleMap:
+      if os.path.exists("scripts/" + fn): indexProofJSON(db, fn[0:-11], merkleMap[fn], "scripts/" + fn)
+      else: print("Missing %s"%fn)
 
 def main():
   print("Use in interactive console. To generate, put the file in the scripts/ folder and run m = generate(fn).")
   print("If test token needed, call generate(fn, True)") 
-  print("For testing after token deposited, run test(fn, m)")
\ No newline at end of file
+  print("For testing after token deposited, run test(fn, m)")
+  print("To deploy weekly distributors as cheap clones, deploy MerkleDistributorFactory once and set FACTORY to its address")
+  print("For a single distributor over all weeks, run m = generateCumulative([fn1, fn2, ...]) once, then generateCumulative([fn1, fn2, ...], m) every week")
+  print("To look up an address across all distributions, run findProof(addr). Run indexExisting() once to index older distributions")
\ No newline at end of file
@@ -0,0 +1,26 @@
+from scripts.lensBatch import batches
+
+# Batch reads of esNUT voting power and NutGovernor receipts through GovernanceLens, split into calls of
+# batchSize accounts by lensBatch.batches. An account costs up to ~30k gas when its checkpoint history is long,
+# so the default keeps each eth_call around 15M gas.
+
+LENS_BATCH = 500
+
+def accountVotes(lens, token, accounts, blockNumber, batchSize = LENS_BATCH):
+  # {account: {"balance", "votes", "pastVotes", "delegatee"}}
+  accounts, result = list(accounts), {}
+  if len(accounts) == 0: return result
+  for batch in batches(accounts, batchSize):
+    for account, balance, votes, pastVotes, delegatee in lens.getAccountVotes(token, batch, blockNumber):
+      result[account] = {"balance": balance, "votes": votes, "pastVotes": pastVotes, "delegatee": delegatee}
+  return result
+
+def proposalVotes(lens, governor, proposalId, voters, batchSize = LENS_BATCH):
+  # (tally, {voter: {"hasVoted", "support", "votes"}}), tally being a dict of the proposal state and totals
+  voters, tally, receipts = list(voters), None, {}
+  for batch in batches(voters, batchSize):
+    state, batchReceipts = lens.getProposalVotes(governor, proposalId, batch)
+    tally = dict(zip(["state", "snapshot", "deadline", "forVotes", "againstVotes", "abstainVotes", "quorum"], state))
+    for voter, hasVoted, support, votes in batchReceipts:
+      receipts[voter] = {"hasVoted": hasVoted, "support": support, "votes": votes}
+  return tally, receipts
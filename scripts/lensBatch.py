@@ -0,0 +1,11 @@
+# Splits long account lists for the lens contracts (GovernanceLens, VestingLens) into eth_call batches.
+# geth and ganache cap an eth_call at 50M gas by default; each lens script sizes its batch from its per-account
+# cost so a call stays well under that cap.
+
+ETH_CALL_GAS_CAP = 50000000
+
+def batches(items, batchSize):
+  # Lists of at most batchSize items; a single empty list when items is empty, so a call is still made
+  items = list(items)
+  if len(items) == 0: return [[]]
+  return [items[start:start + batchSize] for start in range(0, len(items), batchSize)]
@@ -0,0 +1,400 @@
+import os, mmap, struct, hashlib
+from multiprocessing import Pool
+
+# Merkle tree engine for MerkleDistributor. Leaves are keccak256(abi.encodePacked(index, account, amount)),
+# pairs are hashed sorted as in OpenZeppelin's MerkleProof, and odd levels are padded with placeHolder.
+# scripts/generateProof.py is the command line front-end.
+
+_keccak = None
+
+def keccak(data):
+  # eth_utils is only imported once something is hashed, so loading trees from disk stays cheap
+  global _keccak
+  if _keccak is None:
+    from eth_utils import keccak as _keccak
+  return _keccak(data)
+
+LEAF_SIZE = 84  # abi.encodePacked(uint256 index, address account, uint256 amount)
+ROW_SIZE = 52   # account and amount of a leaf, without its index
+NODE_SIZE = 32
+MIN_PARALLEL = 1 << 14  # Hashes per call below which a process pool costs more than it saves
+ROWS_PER_BATCH = 1 << 18  # Rows held in memory at once while hashing leaves
+
+def encodeLeaf(buf, offset, index, addr, amt):
+  if len(addr) != 42: raise ValueError("Invalid address %s"%addr)
+  buf[offset      : offset + 32] = index.to_bytes(32, "big")
+  buf[offset + 32 : offset + 52] = bytes.fromhex(addr[2:])
+  buf[offset + 52 : offset + 84] = amt.to_bytes(32, "big")
+
+def encodeLeaves(rows, start = 0):
+  buf = bytearray(LEAF_SIZE * len(rows))
+  for i in range(len(rows)):
+    addr, amt = rows[i]
+    encodeLeaf(buf, i * LEAF_SIZE, start + i, addr, amt)
+  return buf
+
+def hashLeaves(data):
+  return b"".join(keccak(data[i:i+LEAF_SIZE]) for i in range(0, len(data), LEAF_SIZE))
+
+def hashPairs(level):
+  # Sorted-pair hashing, as expected by OpenZeppelin's MerkleProof.verify
+  out = []
+  for i in range(0, len(level), 2 * NODE_SIZE):
+    a, b = level[i:i+NODE_SIZE], level[i+NODE_SIZE:i+2*NODE_SIZE]
+    out.append(keccak(b + a) if a > b else keccak(a + b))
+  return b"".join(out)
+
+def parallelMap(pool, jobs, fn, data, itemSize):
+  n = len(data) // itemSize
+  if pool is None or n < MIN_PARALLEL: return fn(data)
+  step = -(-n // (jobs * 4)) * itemSize
+  return b"".join(pool.map(fn, [data[i:i+step] for i in range(0, len(data), step)]))
+
+def hashRows(rows, pool = None, jobs = 1):
+  # Consumes an iterable of (addr, amt), only keeping the 32-byte leaf hashes
+  leafHashes, batch = bytearray(), []
+  for row in rows:
+    batch.append(row)
+    if len(batch) == ROWS_PER_BATCH:
+      leafHashes += parallelMap(pool, jobs, hashLeaves, encodeLeaves(batch, len(leafHashes) // NODE_SIZE), LEAF_SIZE)
+      batch = []
+  if len(batch) > 0:
+    leafHashes += parallelMap(pool, jobs, hashLeaves, encodeLeaves(batch, len(leafHashes) // NODE_SIZE), LEAF_SIZE)
+  return leafHashes
+
+# keccak256(abi.encodePacked(uint256(2**256-1), address(0), uint256(0)))
+placeHolder = bytes.fromhex("4f5d95190bb974bfcccf0861739648dab0fd556726db04cbde030907e7569a10")
+
+def buildTree(leafHashes, pool = None, jobs = 1, verbose = False):
+  # Returns a list of levels, each a bytes object of concatenated 32-byte nodes.
+  # Odd levels are padded with placeHolder, matching the published .proofTree.json
+  # verbose prints progress, for the generateProof command line
+  levels = [leafHashes]
+  while len(levels[-1]) != NODE_SIZE:
+    if len(levels[-1]) == 0: raise Exception("!")
+    if len(levels[-1]) % (2 * NODE_SIZE) != 0: levels[-1] += placeHolder
+    nextRound = parallelMap(pool, jobs, hashPairs, levels[-1], 2 * NODE_SIZE)
+    if verbose: print("Next level done, elements: %i"%(len(nextRound) // NODE_SIZE))
+    levels.append(nextRound)
+  return levels
+
+def getProof(levels, index):
+  proof = []
+  for j in range(0, len(levels) - 1):
+    sibling = index ^ 1
+    proof.append(levels[j][sibling * NODE_SIZE : (sibling + 1) * NODE_SIZE])
+    index >>= 1
+  return proof
+
+def toHex(node):
+  return "0x" + node.hex()
+
+def hexLevel(level):
+  return [toHex(level[i:i+NODE_SIZE]) for i in range(0, len(level), NODE_SIZE)]
+
+def readRows(FN):
+  with open(FN) as f:
+    for line in f:
+      line = line.strip()
+      if line == "": continue # Skip empty lines, e.g. at the end of the file
+      addr, amt = line.split(",", 2)
+      yield (addr, int(amt))
+
+# The writers below stream the same bytes json.dump would produce for the full lists
+
+def writeTree(f, levels):
+  f.write("[")
+  for j in range(len(levels)):
+    if j > 0: f.write(", ")
+    f.write("[")
+    for i in range(0, len(levels[j]), NODE_SIZE * 1024):
+      if i > 0: f.write(", ")
+      f.write(", ".join('"%s"'%node for node in hexLevel(levels[j][i:i + NODE_SIZE * 1024])))
+    f.write("]")
+  f.write("]")
+
+def writeProofs(f, levels, leafCount):
+  f.write("[")
+  for i in range(leafCount):
+    if i > 0: f.write(", ")
+    f.write("[" + ", ".join('"%s"'%toHex(node) for node in getProof(levels, i)) + "]")
+  f.write("]")
+
+# Binary tree file: header, a table of (offset, nodeCount) per level, then contiguous 32-byte nodes.
+# Proofs are read on demand, touching one node per level.
+
+TREE_MAGIC = b"NUTMRKL1"
+TREE_HEADER = struct.Struct("<8sQI4x")  # magic, leafCount, levelCount
+TREE_LEVEL = struct.Struct("<QQ")       # offset, nodeCount (including placeHolder padding)
+
+def writeTreeBin(f, levels, leafCount):
+  offset = TREE_HEADER.size + TREE_LEVEL.size * len(levels)
+  f.write(TREE_HEADER.pack(TREE_MAGIC, leafCount, len(levels)))
+  for level in levels:
+    f.write(TREE_LEVEL.pack(offset, len(level) // NODE_SIZE))
+    offset += len(level)
+  for level in levels: f.write(level)
+
+class ProofTree:
+  def __init__(self, FN):
+    self.file = open(FN, "rb")
+    self.data = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+    magic, self.leafCount, levelCount = TREE_HEADER.unpack_from(self.data, 0)
+    if magic != TREE_MAGIC: raise ValueError("%s is not a Merkle tree file"%FN)
+    self.levels = [TREE_LEVEL.unpack_from(self.data, TREE_HEADER.size + TREE_LEVEL.size * j) for j in range(levelCount)]
+
+  def node(self, level, index):
+    offset, nodeCount = self.levels[level]
+    if index >= nodeCount: raise IndexError("Node %i out of range at level %i"%(index, level))
+    return self.data[offset + index * NODE_SIZE : offset + (index + 1) * NODE_SIZE]
+
+  def root(self):
+    return toHex(self.node(len(self.levels) - 1, 0))
+
+  def leaf(self, index):
+    if index >= self.leafCount: raise IndexError("Leaf %i out of range"%index)
+    return toHex(self.node(0, index))
+
+  def proof(self, index):
+    if index >= self.leafCount: raise IndexError("Leaf %i out of range"%index)
+    proof = []
+    for j in range(0, len(self.levels) - 1):
+      proof.append(toHex(self.node(j, index ^ 1)))
+      index >>= 1
+    return proof
+
+  def readLevels(self):
+    return [bytearray(self.data[offset : offset + nodeCount * NODE_SIZE]) for offset, nodeCount in self.levels]
+
+  def close(self):
+    self.data.close()
+    self.file.close()
+
+  def __enter__(self): return self
+  def __exit__(self, *args): self.close()
+
+# Content-addressed build cache. Each build is stored as <key>.proofTree.bin and <key>.rows (packed account
+# and amount per leaf), key being the sha256 of the packed rows. An identical list is served from the cache
+# without hashing; otherwise the previous build of the same list name (or else the last build) is patched,
+# rehashing only the leaves whose row changed and the paths from them to the root.
+
+def packRows(rows):
+  buf = bytearray()
+  for addr, amt in rows:
+    if len(addr) != 42: raise ValueError("Invalid address %s"%addr)
+    buf += bytes.fromhex(addr[2:]) + amt.to_bytes(32, "big")
+  return buf
+
+def encodePackedLeaves(rowsBuf, indices):
+  buf = bytearray(LEAF_SIZE * len(indices))
+  for k, i in enumerate(indices):
+    buf[k * LEAF_SIZE : k * LEAF_SIZE + 32] = i.to_bytes(32, "big")
+    buf[k * LEAF_SIZE + 32 : (k + 1) * LEAF_SIZE] = rowsBuf[i * ROW_SIZE : (i + 1) * ROW_SIZE]
+  return buf
+
+def gatherPairs(level, parents):
+  buf = bytearray(2 * NODE_SIZE * len(parents))
+  for k, p in enumerate(parents): buf[k * 2 * NODE_SIZE : (k + 1) * 2 * NODE_SIZE] = level[p * 2 * NODE_SIZE : (p + 1) * 2 * NODE_SIZE]
+  return buf
+
+def scatterNodes(level, indices, nodes):
+  for k, i in enumerate(indices): level[i * NODE_SIZE : (i + 1) * NODE_SIZE] = nodes[k * NODE_SIZE : (k + 1) * NODE_SIZE]
+
+def updateTree(oldLevels, oldRows, rowsBuf, pool = None, jobs = 1, verbose = False):
+  leafCount, oldCount = len(rowsBuf) // ROW_SIZE, len(oldRows) // ROW_SIZE
+  kept = min(leafCount, oldCount)
+  dirty = [i for i in range(kept) if rowsBuf[i * ROW_SIZE : (i + 1) * ROW_SIZE] != oldRows[i * ROW_SIZE : (i + 1) * ROW_SIZE]]
+  dirty += range(kept, leafCount)
+  if verbose: print("Rehashing %i of %i leaves"%(len(dirty), leafCount))
+
+  level = bytearray(oldLevels[0][: kept * NODE_SIZE] if kept > 0 else b"") + bytearray((leafCount - kept) * NODE_SIZE)
+  scatterNodes(level, dirty, parallelMap(pool, jobs, hashLeaves, encodePackedLeaves(rowsBuf, dirty), LEAF_SIZE))
+  levels = [level]
+  j = 0
+  while len(levels[-1]) != NODE_SIZE:
+    if len(levels[-1]) == 0: raise Exception("!")
+    level = levels[-1]
+    old = oldLevels[j] if j < len(oldLevels) else b""
+    if len(level) % (2 * NODE_SIZE) != 0:
+      level += placeHolder
+      last = len(level) // NODE_SIZE - 1
+      if level[last * NODE_SIZE :] != old[last * NODE_SIZE : (last + 1) * NODE_SIZE] and (len(dirty) == 0 or dirty[-1] != last): dirty.append(last)
+    count = len(level) // (2 * NODE_SIZE)
+    oldNext = oldLevels[j + 1] if j + 1 < len(oldLevels) else b""
+    reused = min(count, len(oldNext) // NODE_SIZE)
+    parents = sorted(set(i >> 1 for i in dirty) | set(range(reused, count)))
+    nextRound = bytearray(oldNext[: reused * NODE_SIZE]) + bytearray((count - reused) * NODE_SIZE)
+    scatterNodes(nextRound, parents, parallelMap(pool, jobs, hashPairs, gatherPairs(level, parents), 2 * NODE_SIZE))
+    levels.append(nextRound)
+    dirty, j = parents, j + 1
+  return levels
+
+def buildCached(rows, name, cacheDir, pool = None, jobs = 1, verbose = False):
+  # Returns (levels, leafCount) for the list called name, building through the cache in cacheDir
+  rowsBuf = packRows(rows)
+  key = hashlib.sha256(rowsBuf).hexdigest()
+  entry = os.path.join(cacheDir, key)
+  latest = os.path.join(cacheDir, name + ".latest")
+  if not os.path.exists(latest): latest = os.path.join(cacheDir, "latest")
+  os.makedirs(cacheDir, exist_ok = True)
+
+  if os.path.exists(entry + ".proofTree.bin"):
+    if verbose: print("Cache hit %s"%key)
+    with ProofTree(entry + ".proofTree.bin") as tree: levels = tree.readLevels()
+  else:
+    base = os.path.join(cacheDir, open(latest).read().strip()) if os.path.exists(latest) else None
+    if base is not None and os.path.exists(base + ".proofTree.bin") and os.path.exists(base + ".rows"):
+      with ProofTree(base + ".proofTree.bin") as tree: oldLevels = tree.readLevels()
+      levels = updateTree(oldLevels, open(base + ".rows", "rb").read(), rowsBuf, pool, jobs, verbose)
+    else:
+      levels = updateTree([], b"", rowsBuf, pool, jobs, verbose)
+    with open(entry + ".rows", "wb") as f: f.write(rowsBuf)
+    with open(entry + ".proofTree.bin", "wb") as f: writeTreeBin(f, levels, len(rowsBuf) // ROW_SIZE)
+
+  for pointer in [name + ".latest", "latest"]:
+    with open(os.path.join(cacheDir, pointer), "w") as f: f.write(key)
+  return levels, len(rowsBuf) // ROW_SIZE
+
+# Offline equivalent of MerkleDistributor.claim's MerkleProof.verify, to check published proofs before deploying
+
+def verifyProof(proof, root, leaf, cache = None):
+  # cache maps a sorted pair to its hash. Claims of one tree share most of their upper pairs,
+  # so a batch of neighbouring claims costs a few hashes per claim instead of one per proof node
+  computed = leaf
+  for node in proof:
+    pair = computed + node if computed < node else node + computed
+    if cache is None: computed = keccak(pair)
+    else:
+      computed = cache.get(pair)
+      if computed is None: computed = cache[pair] = keccak(pair)
+  return computed == root
+
+def verifyBatch(batch):
+  root, claims = batch
+  failed, leaf, cache = [], bytearray(LEAF_SIZE), {}
+  for index, addr, amt, proof in claims:
+    try:
+      encodeLeaf(leaf, 0, index, addr, int(amt))
+      ok = verifyProof([bytes.fromhex(node[2:]) for node in proof], root, keccak(leaf), cache)
+    except ValueError:
+      ok = False
+    if not ok: failed.append(index)
+  return failed
+
+def verifyClaims(root, claims, jobs = 1, batchSize = 1 << 13):
+  # claims is an iterable of (index, addr, amt, proof), proof being a list of hex hashes.
+  # Returns the indices whose proof does not verify against root
+  root = bytes.fromhex(root[2:])
+  batches, batch = [], []
+  for claim in claims:
+    batch.append(claim)
+    if len(batch) == batchSize: batches.append((root, batch)); batch = []
+  if len(batch) > 0: batches.append((root, batch))
+  if jobs <= 1 or len(batches) <= 1: return [i for b in batches for i in verifyBatch(b)]
+  with Pool(jobs) as pool: return [i for failed in pool.imap(verifyBatch, batches) for i in failed]
+
+# OpenZeppelin multiproofs (MerkleProof.multiProofVerify), for MerkleDistributor.claimMulti.
+# Nodes are consumed level by level in ascending index order, which is the queue order multiProofVerify uses.
+
+def getMultiProof(tree, indices):
+  # Returns (leaf indices in the order to pass them, proof, proofFlags)
+  known = sorted(set(indices))
+  for i in known:
+    if i >= tree.leafCount: raise IndexError("Leaf %i out of range"%i)
+  leaves, proof, flags = known, [], []
+  for j in range(0, len(tree.levels) - 1):
+    parents, k = [], 0
+    while k < len(known):
+      if k + 1 < len(known) and known[k + 1] == known[k] ^ 1:
+        flags.append(True)
+        k += 2
+      else:
+        flags.append(False)
+        proof.append(toHex(tree.node(j, known[k] ^ 1)))
+        k += 1
+      parents.append(known[k - 1] >> 1)
+    known = parents
+  return leaves, proof, flags
+
+def processMultiProof(leaves, proof, flags):
+  # Python port of MerkleProof.processMultiProof, on 32-byte nodes
+  if len(leaves) + len(proof) - 1 != len(flags): raise ValueError("MerkleProof: invalid multiproof")
+  queue, proofPos, hashes = list(leaves), 0, []
+  for flag in flags:
+    a = queue.pop(0) if len(queue) > 0 else hashes.pop(0)
+    if flag: b = queue.pop(0) if len(queue) > 0 else hashes.pop(0)
+    else:
+      b = proof[proofPos]
+      proofPos += 1
+    hashes.append(keccak(a + b) if a < b else keccak(b + a))
+  if len(flags) > 0:
+    if proofPos != len(proof): raise ValueError("MerkleProof: invalid multiproof")
+    return hashes[-1]
+  return leaves[0] if len(leaves) > 0 else proof[0]
+
+# Packed calldata of MerkleDistributor.claimCompact and MultiClaim.multiClaimCompact, for L2 deployments.
+# The leaves are unchanged, only the claim arguments are packed.
+CLAIM_COMPACT = bytes.fromhex("36c4e5d0")        # claimCompact()
+MULTI_CLAIM_COMPACT = bytes.fromhex("00d794d9")  # multiClaimCompact()
+
+def encodeCompactClaim(index, addr, amt, proof):
+  # uint32 index | address | uint96 amount | proof hashes, without the selector
+  if len(addr) != 42: raise ValueError("Bad address %s"%addr)
+  if index >= 1 << 32 or amt >= 1 << 96: raise ValueError("Leaf %i does not fit the compact encoding"%index)
+  return index.to_bytes(4, "big") + bytes.fromhex(addr[2:]) + amt.to_bytes(12, "big") + b"".join(bytes.fromhex(node[2:]) for node in proof)
+
+def encodeCompactMultiClaim(claims):
+  # claims are (distributor, index, addr, amt, proof), returns the full multiClaimCompact calldata
+  data = [MULTI_CLAIM_COMPACT]
+  for distributor, index, addr, amt, proof in claims:
+    if len(proof) > 255: raise ValueError("Proof of leaf %i is too long"%index)
+    data += [bytes.fromhex(str(distributor)[2:]), bytes([len(proof)]), encodeCompactClaim(index, addr, amt, proof)]
+  return b"".join(data)
+
+def writeCompactClaims(f, tree, rows):
+  # JSON list of the claimCompact calldata of every leaf, rows in leaf order of tree
+  f.write("[")
+  for i, (addr, amt) in enumerate(rows):
+    f.write("%s\"0x%s\""%("," if i > 0 else "", (CLAIM_COMPACT + encodeCompactClaim(i, addr, amt, tree.proof(i))).hex()))
+  f.write("]")
+
+class MerkleTree:
+  # In-memory tree, with the same reader interface as ProofTree
+  def __init__(self, levels, leafCount):
+    self.levels, self.leafCount = levels, leafCount
+
+  def node(self, level, index):
+    return self.levels[level][index * NODE_SIZE : (index + 1) * NODE_SIZE]
+
+  def root(self):
+    return toHex(self.levels[-1])
+
+  def leaf(self, index):
+    if index >= self.leafCount: raise IndexError("Leaf %i out of range"%index)
+    return toHex(self.levels[0][index * NODE_SIZE : (index + 1) * NODE_SIZE])
+
+  def proof(self, index):
+    if index >= self.leafCount: raise IndexError("Leaf %i out of range"%index)
+    return [toHex(node) for node in getProof(self.levels, index)]
+
+  def writeBin(self, FN):
+    with open(FN, "wb") as f: writeTreeBin(f, self.levels, self.leafCount)
+
+  def writeJSON(self, FN):
+    # The .proofTree.json and .proof.json pair generateProof has always published
+    with open(FN + ".proofTree.json", "w") as f: writeTree(f, self.levels)
+    with open(FN + ".proof.json", "w") as f: writeProofs(f, self.levels, self.leafCount)
+
+def generateTree(rows, jobs = 1, cacheDir = None, name = "latest", verbose = False):
+  # rows is an iterable of (addr, amt) in leaf order
+  pool = Pool(jobs) if jobs > 1 else None
+  try:
+    if cacheDir is not None:
+      levels, leafCount = buildCached(rows, name, cacheDir, pool, jobs, verbose)
+    else:
+      leafHashes = hashRows(rows, pool, jobs)
+      leafCount = len(leafHashes) // NODE_SIZE
+      levels = buildTree(leafHashes, pool, jobs, verbose)
+  finally:
+    if pool is not None: pool.close()
+  return MerkleTree(levels, leafCount)
@@ -0,0 +1,22 @@
+import json
+
+# Onboards a cohort of investors onto ScheduledVesting, batchSize accounts at a time: one
+# LinearVesting.overrideLockEndTimes, one esNUT.transferBatch and one ScheduledVesting.setSchedules per batch.
+# In the brownie console: onboard(loadCohort("scripts/cohort.json"), esnut, linearVesting, scheduledVesting, admin)
+
+BATCH_SIZE = 100
+
+def loadCohort(FN):
+  # {address: [[timestampAvailable, amount], ...]}, amounts may be decimal strings
+  return {addr: [(int(t), int(amt)) for t, amt in schedule] for addr, schedule in json.load(open(FN)).items()}
+
+def onboard(cohort, esnut, linearVesting, scheduledVesting, sender, batchSize = BATCH_SIZE):
+  accounts = list(cohort)
+  txs = []
+  for start in range(0, len(accounts), batchSize):
+    batch = accounts[start:start + batchSize]
+    totals = [sum(amt for t, amt in cohort[addr]) for addr in batch]
+    txs.append(linearVesting.overrideLockEndTimes(batch, [cohort[addr][-1][0] for addr in batch], totals, {"from": sender}))
+    txs.append(esnut.transferBatch(batch, totals, {"from": sender}))
+    txs.append(scheduledVesting.setSchedules(batch, [cohort[addr] for addr in batch], {"from": sender}))
+  return txs
@@ -0,0 +1,83 @@
+import os, json, sqlite3
+from scripts.merkle import ProofTree, NODE_SIZE
+
+# SQLite index of every published distribution, keyed by address.
+# Claims are clustered on address so a lookup across all distributions is one range scan.
+
+INDEX_DB = "scripts/proofIndex.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS distributions (
+  name        TEXT PRIMARY KEY,
+  distributor TEXT,
+  root        TEXT,
+  treeFile    TEXT,           -- .proofTree.bin relative to the database file, NULL for distributions indexed from a .proof.json
+  leafCount   INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+  address      TEXT NOT NULL,  -- lowercase
+  distribution TEXT NOT NULL REFERENCES distributions(name),
+  leafIndex    INTEGER NOT NULL,
+  amount       TEXT NOT NULL,  -- uint256 does not fit in an SQLite INTEGER
+  proofOffset  INTEGER,        -- byte offset of the leaf node in treeFile
+  proof        TEXT,           -- JSON list of hashes, only when there is no treeFile
+  PRIMARY KEY (address, distribution, leafIndex)
+) WITHOUT ROWID;
+"""
+
+def openIndex(FN = INDEX_DB):
+  db = sqlite3.connect(FN)
+  db.executescript(SCHEMA)
+  return db
+
+def _dbDir(db):
+  # Directory of the database file, None for an in-memory database
+  path = db.execute("PRAGMA database_list").fetchone()[2]
+  return os.path.dirname(path) if path else None
+
+def _storedPath(db, treeFile):
+  dbDir = _dbDir(db)
+  return os.path.relpath(os.path.abspath(treeFile), dbDir) if dbDir else os.path.abspath(treeFile)
+
+def _treePath(db, distribution, treeFile):
+  # Resolves a stored treeFile; indexes built before paths were stored relative to the database hold paths
+  # relative to the directory they were built from
+  dbDir = _dbDir(db)
+  for path in [os.path.join(dbDir, treeFile) if dbDir else treeFile, treeFile]:
+    if os.path.exists(path): return path
+  raise FileNotFoundError("Proof tree of distribution %s not found at %s. Regenerate it or re-index the distribution."%(distribution, treeFile))
+
+def _replaceDistribution(db, name, distributor, root, treeFile, leafCount, claims):
+  with db:
+    db.execute("DELETE FROM claims WHERE distribution = ?", (name,))
+    db.execute("INSERT OR REPLACE INTO distributions VALUES (?, ?, ?, ?, ?)", (name, distributor, root, treeFile, leafCount))
+    db.executemany("INSERT INTO claims VALUES (?, ?, ?, ?, ?, ?)", claims)
+
+# rows are the (addr, amt) pairs in leaf order, treeFile the matching .proofTree.bin from generateProof
+def indexDistribution(db, name, distributor, rows, treeFile):
+  with ProofTree(treeFile) as tree:
+    leafOffset = tree.levels[0][0]
+    claims = [(addr.lower(), name, i, str(amt), leafOffset + i * NODE_SIZE, None) for i, (addr, amt) in enumerate(rows)]
+    if len(claims) != tree.leafCount: raise ValueError("%s has %i leaves, got %i rows"%(treeFile, tree.leafCount, len(claims)))
+    _replaceDistribution(db, name, distributor, tree.root(), _storedPath(db, treeFile), tree.leafCount, claims)
+
+# For distributions published before the index existed, from the merged <name>.proof.json of generateFromJSON
+def indexProofJSON(db, name, distributor, FN):
+  fn_json = json.load(open(FN))
+  claims = [(addr.lower(), name, v["index"], str(v["week_incentive"]), None, json.dumps(v["proof"])) for addr, v in fn_json.items()]
+  _replaceDistribution(db, name, distributor, None, None, len(claims), claims)
+
+# Every claim of addr across all indexed distributions, with its proof
+def lookup(db, addr):
+  result, trees = [], {}
+  query = """SELECT c.distribution, d.distributor, c.leafIndex, c.amount, c.proof, d.treeFile
+             FROM claims c JOIN distributions d ON d.name = c.distribution WHERE c.address = ?"""
+  for distribution, distributor, index, amount, proof, treeFile in db.execute(query, (addr.lower(),)):
+    if proof is None:
+      if treeFile not in trees: trees[treeFile] = ProofTree(_treePath(db, distribution, treeFile))
+      proof = trees[treeFile].proof(index)
+    else:
+      proof = json.loads(proof)
+    result.append({"distribution": distribution, "distributor": distributor, "index": index, "amount": amount, "proof": proof})
+  for tree in trees.values(): tree.close()
+  return result
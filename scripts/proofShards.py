@@ -0,0 +1,62 @@
+import json, os, base64, shutil
+
+# Static proof bundles for the claim page. Claims are split into shards by the hex prefix of the account:
+# a prefix holding more than maxPerShard accounts is split on its next hex digit, so every shard stays
+# small however large the distribution grows. manifest.json lists the shard prefixes; the page fetches
+# manifest.json, then shard_<longest matching prefix>.json for the connected wallet.
+#
+# Shard entries are address (lowercase) -> [index, amount, proof], amount being a decimal string
+# (JSON numbers round in the browser) and proof the base64 of the concatenated 32-byte sibling hashes.
+#
+# writeShards builds the bundle in <outDir>.tmp and swaps it in, so shards of a previous run with other prefixes
+# never sit next to the new manifest.json.
+
+MAX_PER_SHARD = 512
+
+def encodeProof(proof):
+  return base64.b64encode(b"".join(bytes.fromhex(node[2:]) for node in proof)).decode()
+
+def decodeProof(data):
+  raw = base64.b64decode(data)
+  return ["0x" + raw[i:i+32].hex() for i in range(0, len(raw), 32)]
+
+def _split(entries, prefix, maxPerShard, shards):
+  if len(entries) <= maxPerShard or len(prefix) == 40:
+    shards[prefix] = entries
+    return
+  children = {}
+  for entry in entries: children.setdefault(entry[0][2 + len(prefix)], []).append(entry)
+  for digit in sorted(children): _split(children[digit], prefix + digit, maxPerShard, shards)
+
+def writeShards(outDir, tree, rows, maxPerShard = MAX_PER_SHARD, **manifest):
+  # rows are the (addr, amt) pairs in leaf order of tree (a MerkleTree or ProofTree)
+  entries = [(addr.lower(), i, amt) for i, (addr, amt) in enumerate(rows)]
+  shards = {}
+  _split(entries, "", maxPerShard, shards)
+
+  outDir = os.path.normpath(str(outDir))
+  tmpDir, oldDir = outDir + ".tmp", outDir + ".old"
+  for d in [tmpDir, oldDir]: shutil.rmtree(d, ignore_errors = True)
+  os.makedirs(tmpDir)
+  for prefix, shard in shards.items():
+    data = {addr: [i, str(amt), encodeProof(tree.proof(i))] for addr, i, amt in shard}
+    with open(os.path.join(tmpDir, "shard_%s.json"%prefix), "w") as f: json.dump(data, f, separators = (",", ":"))
+
+  manifest.update({"root": tree.root(), "leafCount": tree.leafCount, "shards": sorted(shards)})
+  with open(os.path.join(tmpDir, "manifest.json"), "w") as f: json.dump(manifest, f, separators = (",", ":"))
+
+  if os.path.exists(outDir): os.rename(outDir, oldDir)
+  os.rename(tmpDir, outDir)
+  shutil.rmtree(oldDir, ignore_errors = True)
+  return len(shards)
+
+def findClaim(outDir, addr):
+  # Same lookup the claim page performs, returns (index, amount, proof) or None
+  addr = addr.lower()
+  prefixes = set(json.load(open(os.path.join(outDir, "manifest.json")))["shards"])
+  for length in range(40, -1, -1):
+    if addr[2:2 + length] in prefixes:
+      entry = json.load(open(os.path.join(outDir, "shard_%s.json"%addr[2:2 + length]))).get(addr)
+      if entry is None: return None
+      return entry[0], int(entry[1]), decodeProof(entry[2])
+  return None
@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+
+# Verifies every claim of a merged <name>.proof.json written by generateFromJSON against a Merkle root,
+# without any chain access. Run from the repository root:
+#   python3 -m scripts.verifyProofs scripts/<name>.proof.json <root>
+
+import os, sys, json, time, argparse
+from scripts.merkle import verifyClaims
+
+def main():
+  parser = argparse.ArgumentParser(description = "Verify all proofs of a distribution against its Merkle root")
+  parser.add_argument("FN")
+  parser.add_argument("root")
+  parser.add_argument("-j", "--jobs", type = int, default = os.cpu_count())
+  args = parser.parse_args()
+
+  fn_json = json.load(open(args.FN))
+  t = time.time()
+  failed = verifyClaims(args.root, ((v["index"], addr, v["week_incentive"], v["proof"]) for addr, v in fn_json.items()), args.jobs)
+  print("Verified %i claims in %.1fs, %i invalid"%(len(fn_json), time.time() - t, len(failed)))
+  for i in failed[:20]: print("Invalid proof for index %i"%i)
+  sys.exit(1 if len(failed) > 0 else 0)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,21 @@
+from scripts.lensBatch import batches
+
+# Batch reads of LinearVesting and ScheduledVesting positions through VestingLens, split into calls of batchSize
+# accounts by lensBatch.batches. An account costs ~30k gas plus ~2k per unvested schedule entry, so the default
+# leaves room for long schedules.
+# Pass scheduledVesting = ZERO_ADDRESS to read LinearVesting only.
+
+VESTING_LENS_BATCH = 200
+
+STATUS_FIELDS = ["esnutBalance", "vestingStart", "esnutVesting", "claimable", "earlyWithdrawPenalty", "earlyWithdrawRefund",
+                 "lockedUntil", "esnutLocked", "locked", "adminLock",
+                 "scheduleVestable", "scheduleRemaining", "nextTrancheTimestamp", "nextTrancheAmount"]
+
+def vestingStatus(lens, linearVesting, scheduledVesting, accounts, batchSize = VESTING_LENS_BATCH):
+  # {account: {field: value for field in STATUS_FIELDS}}
+  accounts, result = list(accounts), {}
+  if len(accounts) == 0: return result
+  for batch in batches(accounts, batchSize):
+    for account, *status in lens.getVestingStatus(linearVesting, scheduledVesting, batch):
+      result[account] = dict(zip(STATUS_FIELDS, status))
+  return result
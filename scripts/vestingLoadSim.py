@@ -0,0 +1,153 @@
+import json, time, random
+from brownie import accounts, chain, esNUT, NUT, LinearVesting, ScheduledVesting
+from brownie.exceptions import VirtualMachineError
+from scripts.onboard import onboard
+
+# Multi-user load simulation of LinearVesting, ScheduledVesting and esNUT on a local chain.
+#   brownie run scripts/vestingLoadSim.py main 2000 1 --network development
+# Synthetic users get randomized timelines (lock, vest, claim, cancel, early withdraw for LinearVesting; schedules,
+# vests and admin cancels for ScheduledVesting). Actions of every user are merged in time order and replayed with
+# chain.mine(timestamp=...), at most one time jump per TIME_BUCKET. The report has the gas distribution of each
+# action, transactions per second of the replay, failed transactions and the conservation invariants at the end.
+# The development network has a zero gas price, so users need no ETH.
+
+DAY = 86400
+TIME_BUCKET = 3600        # Actions within the same hour share one time jump
+LINEAR_SHARE = 0.7        # Fraction of users on LinearVesting, the rest are on ScheduledVesting
+MAX_AMOUNT = 10**5        # Whole esNUT per user
+
+def linearTimeline(rng, start):
+  # (funded, [(timestamp, action, args)]) of a LinearVesting user
+  funded = rng.randrange(1, MAX_AMOUNT) * 10**18
+  t = start + rng.randrange(0, 30 * DAY)
+  actions = []
+  locked = 0
+  if rng.random() < 0.3:
+    locked = rng.randrange(1, funded // 2 + 2)
+    actions.append((t, "lock", (rng.randrange(30, 180) * DAY, locked)))
+  t += TIME_BUCKET
+  actions.append((t, "startVesting", (funded - locked,)))
+  end, final = t + rng.randrange(91, 120) * DAY, "claimVestedTokens"
+  if rng.random() < 0.3:
+    end, final = t + rng.randrange(2 * TIME_BUCKET, 89 * DAY), rng.choice(["earlyWithdraw", "cancelVesting"])
+  for claim in sorted(rng.randrange(t + TIME_BUCKET, end) for i in range(rng.randrange(0, 4))):
+    actions.append((claim, "claimVestedTokens", ()))
+  actions.append((end, final, ()))
+  return funded, actions
+
+def scheduledTimeline(rng, start):
+  # (funded, schedule, [(timestamp, action, args)]) of a ScheduledVesting user
+  entries = rng.randrange(1, 13)
+  amounts = [rng.randrange(1, MAX_AMOUNT) * 10**18 for i in range(entries)]
+  schedule = [(start + (i + 1) * 30 * DAY + rng.randrange(0, DAY), amt) for i, amt in enumerate(amounts)]
+  end = schedule[-1][0] + 30 * DAY
+  actions = [(rng.randrange(start, end), "vestTokens", ()) for i in range(rng.randrange(1, 5))]
+  if rng.random() < 0.1:
+    actions.append((rng.randrange(start, end), "cancelSchedule", ()))
+  return sum(amounts), schedule, sorted(actions)
+
+def generateUsers(count, start, seed):
+  # [{"kind", "funded", "schedule", "actions"}], deterministic for a seed
+  rng = random.Random(seed)
+  users = []
+  for i in range(count):
+    if rng.random() < LINEAR_SHARE:
+      funded, actions = linearTimeline(rng, start)
+      users.append({"kind": "linear", "funded": funded, "schedule": None, "actions": actions})
+    else:
+      funded, schedule, actions = scheduledTimeline(rng, start)
+      users.append({"kind": "scheduled", "funded": funded, "schedule": schedule, "actions": actions})
+  return users
+
+def deploy(admin):
+  esnut = esNUT.deploy({"from": admin})
+  esnut.mint(admin, 1e28, {"from": admin})
+  linearVesting = LinearVesting.deploy(esnut, {"from": admin})
+  scheduledVesting = ScheduledVesting.deploy(esnut, linearVesting, {"from": admin})
+  esnut.grantRole(esnut.UNLOCK_ROLE(), linearVesting, {"from": admin})
+  esnut.grantRole(esnut.TRANSFER_ROLE(), linearVesting, {"from": admin})
+  esnut.grantRole(esnut.UNLOCK_ROLE(), scheduledVesting, {"from": admin})
+  return esnut, NUT.at(esnut.nutToken()), linearVesting, scheduledVesting
+
+def gasStats(gasUsed):
+  gasUsed = sorted(gasUsed)
+  pick = lambda p: gasUsed[min(len(gasUsed) - 1, int(p * len(gasUsed)))]
+  return {"count": len(gasUsed), "mean": sum(gasUsed) // len(gasUsed), "min": gasUsed[0],
+          "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": gasUsed[-1]}
+
+def checkInvariants(esnut, nut, linearVesting, feeCollector, users, penalties, initialSupply):
+  # {name: bool}: NUT + esNUT supply unchanged, LinearVesting holds exactly the esNUT still vesting, the fee
+  # collector holds exactly the penalties, and every user holds what it was funded minus its penalty
+  inVesting, conserved = 0, True
+  for u in users:
+    deposited, collected = linearVesting.vestingSchedules(u["address"])[1:]
+    inVesting += deposited - collected
+    held = nut.balanceOf(u["address"]) + esnut.balanceOf(u["address"]) + deposited - collected
+    conserved &= held + penalties.get(u["address"], 0) == u["funded"]
+  return {
+    "supply": esnut.totalSupply() + nut.totalSupply() == initialSupply,
+    "linearVestingBalance": esnut.balanceOf(linearVesting) == inVesting,
+    "penalties": esnut.balanceOf(feeCollector) == sum(penalties.values()),
+    "perUser": conserved,
+  }
+
+def simulate(userCount, seed = 1, admin = None):
+  admin = admin or accounts[0]
+  feeCollector = accounts.add()
+  esnut, nut, linearVesting, scheduledVesting = deploy(admin)
+  linearVesting.setFeeCollector(feeCollector, {"from": admin})
+  initialSupply = esnut.totalSupply() + nut.totalSupply()
+
+  users = generateUsers(userCount, chain.time() + DAY, seed)
+  for u in users:
+    u["account"] = accounts.add()
+    u["address"] = u["account"].address
+  setupGas = {}
+  linear = [u for u in users if u["kind"] == "linear"]
+  for start in range(0, len(linear), 100):
+    tx = esnut.transferBatch([u["address"] for u in linear[start:start + 100]], [u["funded"] for u in linear[start:start + 100]], {"from": admin})
+    setupGas.setdefault("esNUT.transferBatch", []).append(tx.gas_used)
+  cohort = {u["address"]: u["schedule"] for u in users if u["kind"] == "scheduled"}
+  for tx in onboard(cohort, esnut, linearVesting, scheduledVesting, admin):
+    setupGas.setdefault(tx.fn_name, []).append(tx.gas_used)
+
+  timeline = sorted((t, i, action, args) for i, u in enumerate(users) for t, action, args in u["actions"])
+  contracts = {"lock": linearVesting, "startVesting": linearVesting, "claimVestedTokens": linearVesting, "earlyWithdraw": linearVesting,
+               "cancelVesting": linearVesting, "vestTokens": scheduledVesting, "cancelSchedule": scheduledVesting}
+  gasUsed, failed, penalties = {}, {}, {}
+  started = time.perf_counter()
+  for t, i, action, args in timeline:
+    if t - t % TIME_BUCKET > chain.time(): chain.mine(timestamp = t - t % TIME_BUCKET)
+    user = users[i]["account"]
+    if action == "startVesting":
+      gasUsed.setdefault("approve", []).append(esnut.approve(linearVesting, args[0], {"from": user}).gas_used)
+    if action == "vestTokens": args = (user.address,)
+    if action == "cancelSchedule": args, user = (user.address,), admin
+    try:
+      tx = getattr(contracts[action], action)(*args, {"from": user})
+    except VirtualMachineError as e:
+      failed.setdefault(action, []).append(str(e))
+      continue
+    gasUsed.setdefault(action, []).append(tx.gas_used)
+    if action == "earlyWithdraw": penalties[users[i]["address"]] = tx.events["EarlyLinearUnlock"]["penaltyAmount"]
+  elapsed = time.perf_counter() - started
+
+  txs = sum(len(g) for g in gasUsed.values()) + sum(len(f) for f in failed.values())
+  return {
+    "users": userCount, "seed": seed, "txs": txs, "seconds": elapsed, "tps": txs / elapsed if elapsed > 0 else 0,
+    "gas": {action: gasStats(g) for action, g in sorted(gasUsed.items())},
+    "setupGas": {fn: gasStats(g) for fn, g in setupGas.items()},
+    "failed": {action: len(f) for action, f in failed.items()},
+    "invariants": checkInvariants(esnut, nut, linearVesting, feeCollector, users, penalties, initialSupply),
+  }
+
+def main(userCount = 1000, seed = 1, out = None):
+  report = simulate(int(userCount), int(seed))
+  print("%i users, %i transactions in %.1fs, %.1f tx/s"%(report["users"], report["txs"], report["seconds"], report["tps"]))
+  for action, s in list(report["setupGas"].items()) + list(report["gas"].items()):
+    print("%-40s %6i txs  mean %8i  p50 %8i  p90 %8i  p99 %8i  max %8i"%(action, s["count"], s["mean"], s["p50"], s["p90"], s["p99"], s["max"]))
+  for action, count in report["failed"].items(): print("FAILED %-33s %6i txs"%(action, count))
+  for name, ok in report["invariants"].items(): print("%-40s %s"%(name, "ok" if ok else "BROKEN"))
+  if out is not None:
+    with open(out, "a") as f: f.write(json.dumps(report) + "\n")
+  return report
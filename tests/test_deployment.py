@@ -508,3 +508,29 @@ def test_linear_vesting_additional():
     assert linear_vesting.minPenalty() != TARGET_PENALTY, "minPenalty pre-condition check failed"
     linear_vesting.setMinPenalty(TARGET_PENALTY)
     assert linear_vesting.minPenalty() == TARGET_PENALTY, "minPenalty setting failed" 
+
+def test_pause_mirrored_to_esnut():
+    esnut = esNUT.deploy({'from': accounts[0]})
+    esnut.mint(accounts[0], 1e26, {"from": accounts[0]})
+    nut = NUT.at(esnut.nutToken())
+    assert nut.pauseListener() == esnut.address and not esnut.nutPaused()
+    assert esnut.CAP() == nut.cap()
+
+    # Only NUT can set the mirrored state, and nobody can redirect NUT's notifications
+    with brownie.reverts("veNUTS: Only NUTS can set pause state"):
+        esnut.setNutPaused(True, {'from': accounts[0]})
+    with brownie.reverts():
+        nut.setPauseListener(accounts[0], {'from': accounts[0]})
+
+    nut.grantRole(nut.PAUSER_ROLE(), accounts[1], {"from": accounts[0]})
+    nut.pause({'from': accounts[1]})
+    assert esnut.nutPaused()
+    with brownie.reverts("Paused"):
+        esnut.transfer(accounts[2], 1e18, {'from': accounts[0]})
+    nut.unpause({'from': accounts[1]})
+    assert not esnut.nutPaused()
+    esnut.transfer(accounts[2], 1e18, {'from': accounts[0]})
+
+    # Minting esNUT is still capped against the combined supply
+    with brownie.reverts("veNUTS: NUT + veNUTS invariant breached"):
+        esnut.mint(accounts[0], 1e28 - 1e26 + 1, {"from": accounts[0]})
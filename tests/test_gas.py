@@ -0,0 +1,283 @@
+# Gas regression suite. Run with "brownie test tests/test_gas.py -s".
+# Every public function is measured over a range of input sizes (schedule length, batch size, proof depth,
+# checkpoint history) and compared with tests/gas_baseline.json. A measurement more than GAS_TOLERANCE
+# (default 1%) above its baseline fails, and so does a measurement with no baseline. Without
+# tests/gas_baseline.json the suite is skipped. Run with GAS_UPDATE=1 on the reference ganache setup to write the
+# current numbers, after an intended change or a new measurement, and commit tests/gas_baseline.json.
+
+import json, os, brownie, pytest
+from brownie import accounts, chain, NUT, esNUT, LinearVesting, ScheduledVesting, MerkleDistributor, MerkleDistributorClone, MerkleDistributorFactory, MultiClaim, CumulativeMerkleDistributor, NutGovernor, TimelockController, GovernanceLens, VestingLens
+from web3 import Web3
+
+BASELINE = os.path.join(os.path.dirname(__file__), "gas_baseline.json")
+TOLERANCE = float(os.environ.get("GAS_TOLERANCE", "0.01"))
+UPDATE = os.environ.get("GAS_UPDATE", "") not in ("", "0")
+
+DAY = 86400
+
+class GasLog:
+  def __init__(self):
+    if not UPDATE and not os.path.exists(BASELINE):
+      pytest.skip("%s is missing, run with GAS_UPDATE=1 to create it"%BASELINE)
+    self.baseline = json.load(open(BASELINE)) if os.path.exists(BASELINE) else {}
+    self.measured = {}
+
+  def record(self, name, gasUsed):
+    if hasattr(gasUsed, "gas_used"): gasUsed = gasUsed.gas_used
+    self.measured[name] = gasUsed
+    print("%-50s %9i"%(name, gasUsed))
+    if UPDATE: return
+    assert name in self.baseline, "%s has no baseline, run with GAS_UPDATE=1 to record it"%name
+    limit = self.baseline[name] * (1 + TOLERANCE)
+    assert gasUsed <= limit, "%s used %i gas, baseline %i"%(name, gasUsed, self.baseline[name])
+
+  def save(self):
+    if not UPDATE: return
+    self.baseline.update(self.measured)
+    json.dump(self.baseline, open(BASELINE, "w"), indent = 1, sort_keys = True)
+
+@pytest.fixture(scope="module")
+def gas():
+  log = GasLog()
+  yield log
+  log.save()
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+  pass
+
+@pytest.fixture(scope="module")
+def esnut():
+  esnut = esNUT.deploy({'from': accounts[0]})
+  esnut.mint(accounts[0], 1e27, {"from": accounts[0]})
+  yield esnut
+
+@pytest.fixture(scope="module")
+def nut(esnut):
+  yield NUT.at(esnut.nutToken())
+
+@pytest.fixture(scope="module")
+def linear_vesting(esnut):
+  linear_vesting = LinearVesting.deploy(esnut, {'from': accounts[0]})
+  esnut.grantRole(esnut.UNLOCK_ROLE(), linear_vesting, {"from": accounts[0]})
+  esnut.grantRole(esnut.TRANSFER_ROLE(), linear_vesting, {"from": accounts[0]})
+  yield linear_vesting
+
+@pytest.fixture(scope="module")
+def scheduled_vesting(esnut, linear_vesting):
+  scheduled_vesting = ScheduledVesting.deploy(esnut, linear_vesting, {'from': accounts[0]})
+  esnut.grantRole(esnut.UNLOCK_ROLE(), scheduled_vesting, {"from": accounts[0]})
+  yield scheduled_vesting
+
+def test_nut_gas(gas):
+  nut = NUT.deploy({'from': accounts[0]})
+  gas.record("NUT.mint", nut.mint(accounts[1], 1e24, {'from': accounts[0]}))
+  gas.record("NUT.transfer", nut.transfer(accounts[2], 1e18, {'from': accounts[1]}))
+  gas.record("NUT.approve", nut.approve(accounts[3], 1e18, {'from': accounts[1]}))
+  gas.record("NUT.transferFrom", nut.transferFrom(accounts[1], accounts[3], 1e18, {'from': accounts[3]}))
+  gas.record("NUT.burn", nut.burn(accounts[1], 1e18, {'from': accounts[0]}))
+  gas.record("NUT.pause", nut.pause({'from': accounts[0]}))
+  gas.record("NUT.unpause", nut.unpause({'from': accounts[0]}))
+  nut.grantRole(nut.RESCUE_ROLE(), accounts[0], {'from': accounts[0]})
+  nut.mint(nut, 1e18, {'from': accounts[0]})
+  gas.record("NUT.rescueERC20", nut.rescueERC20(nut, accounts[0], 1e18, {'from': accounts[0]}))
+
+def test_esnut_gas(gas, esnut, nut):
+  esnut.grantRole(esnut.UNLOCK_ROLE(), accounts[0], {"from": accounts[0]})
+  gas.record("esNUT.mint", esnut.mint(accounts[1], 1e18, {"from": accounts[0]}))
+  gas.record("esNUT.transfer[locked]", esnut.transfer(accounts[1], 1e24, {"from": accounts[0]}))
+  gas.record("esNUT.approve", esnut.approve(accounts[2], 1e24, {"from": accounts[1]}))
+  gas.record("esNUT.unlock", esnut.unlock(accounts[1], 1e23, {"from": accounts[0]}))
+  gas.record("esNUT.unlockTo", esnut.unlockTo(accounts[1], accounts[2], 1e23, {"from": accounts[0]}))
+  gas.record("esNUT.lock", esnut.lock(1e22, {"from": accounts[1]}))
+  gas.record("esNUT.burn", esnut.burn(1e18, {"from": accounts[0]}))
+  gas.record("esNUT.setTokenLock", esnut.setTokenLock(False, {"from": accounts[0]}))
+  gas.record("esNUT.transfer[unlocked]", esnut.transfer(accounts[2], 1e18, {"from": accounts[1]}))
+  gas.record("esNUT.transferFrom", esnut.transferFrom(accounts[1], accounts[3], 1e18, {"from": accounts[2]}))
+  gas.record("esNUT.delegate", esnut.delegate(accounts[1], {"from": accounts[1]}))
+  esnut.delegate(accounts[2], {"from": accounts[2]})
+  gas.record("esNUT.transfer[delegated]", esnut.transfer(accounts[2], 1e18, {"from": accounts[1]}))
+  nut.grantRole(nut.PAUSER_ROLE(), accounts[0], {"from": accounts[0]})
+  gas.record("NUT.pause[paired]", nut.pause({"from": accounts[0]}))
+  gas.record("NUT.unpause[paired]", nut.unpause({"from": accounts[0]}))
+
+  # Vote lookups against a growing checkpoint history
+  start = chain.height
+  for history in [1, 16, 128]:
+    while esnut.numCheckpoints(accounts[1]) < history:
+      esnut.transfer(accounts[2], 1, {"from": accounts[1]})
+    chain.mine()
+    gas.record("esNUT.getPastVotes[%i]"%history, esnut.getPastVotes.estimate_gas(accounts[1], start))
+    gas.record("esNUT.transfer[history %i]"%history, esnut.transfer(accounts[2], 1, {"from": accounts[1]}))
+
+def test_linear_vesting_gas(gas, esnut, nut, linear_vesting):
+  for i in range(1, 5):
+    esnut.transfer(accounts[i], 1e24, {"from": accounts[0]})
+    esnut.approve(linear_vesting, 1e24, {"from": accounts[i]})
+
+  gas.record("LinearVesting.startVesting", linear_vesting.startVesting(1e23, {"from": accounts[1]}))
+  chain.sleep(30 * DAY)
+  gas.record("LinearVesting.claimVestedTokens[partial]", linear_vesting.claimVestedTokens({"from": accounts[1]}))
+  gas.record("LinearVesting.startVesting[restart]", linear_vesting.startVesting(1e23, {"from": accounts[1]}))
+  chain.sleep(30 * DAY)
+  gas.record("LinearVesting.earlyWithdraw", linear_vesting.earlyWithdraw({"from": accounts[1]}))
+
+  linear_vesting.startVesting(1e23, {"from": accounts[2]})
+  chain.sleep(10 * DAY)
+  gas.record("LinearVesting.cancelVesting", linear_vesting.cancelVesting({"from": accounts[2]}))
+
+  linear_vesting.startVesting(1e23, {"from": accounts[3]})
+  chain.sleep(91 * DAY)
+  gas.record("LinearVesting.claimVestedTokens[complete]", linear_vesting.claimVestedTokens({"from": accounts[3]}))
+
+  gas.record("LinearVesting.lock", linear_vesting.lock(30 * DAY, 1e23, {"from": accounts[4]}))
+  gas.record("LinearVesting.overrideLockEndTime", linear_vesting.overrideLockEndTime(accounts[5], chain.time() + DAY, 1e18, {"from": accounts[0]}))
+  gas.record("LinearVesting.setMinPenalty", linear_vesting.setMinPenalty(0.25e18, {"from": accounts[0]}))
+  gas.record("LinearVesting.setFeeCollector", linear_vesting.setFeeCollector(accounts[9], {"from": accounts[0]}))
+
+@pytest.mark.parametrize("length", [1, 12, 48])
+def test_scheduled_vesting_gas(gas, esnut, linear_vesting, scheduled_vesting, length):
+  now = chain.time()
+  schedule = [(now + (i + 1) * 30 * DAY, 10**18) for i in range(length)]
+  users = [accounts.add().address for i in range(3)]
+  for user in users:
+    linear_vesting.overrideLockEndTime(user, schedule[-1][0], length * 10**18, {"from": accounts[0]})
+    esnut.transfer(user, length * 10**18, {"from": accounts[0]})
+
+  gas.record("ScheduledVesting.setSchedule[%i]"%length, scheduled_vesting.setSchedule(users[0], schedule, {"from": accounts[0]}))
+  scheduled_vesting.setSchedule(users[1], schedule, {"from": accounts[0]})
+  scheduled_vesting.setSchedule(users[2], schedule, {"from": accounts[0]})
+
+  chain.mine(timestamp = schedule[0][0])
+  gas.record("ScheduledVesting.vestTokens[%i, first]"%length, scheduled_vesting.vestTokens(users[0], {"from": accounts[0]}))
+  chain.mine(timestamp = schedule[length // 2][0] + 1)
+  gas.record("ScheduledVesting.vestTokens[%i, middle]"%length, scheduled_vesting.vestTokens(users[0], {"from": accounts[0]}))
+  gas.record("ScheduledVesting.vestTokens[%i, nothing due]"%length, scheduled_vesting.vestTokens(users[0], {"from": accounts[0]}))
+  gas.record("ScheduledVesting.cancelSchedule[%i]"%length, scheduled_vesting.cancelSchedule(users[1], {"from": accounts[0]}))
+  chain.mine(timestamp = schedule[-1][0] + 2)
+  gas.record("ScheduledVesting.vestTokens[%i, last]"%length, scheduled_vesting.vestTokens(users[2], {"from": accounts[0]}))
+
+@pytest.mark.parametrize("cohort", [10, 50])
+def test_onboarding_gas(gas, esnut, linear_vesting, scheduled_vesting, cohort):
+  now = chain.time()
+  users = [accounts.add().address for i in range(cohort)]
+  schedule = [(now + (i + 1) * 30 * DAY, 10**18) for i in range(12)]
+  gas.record("LinearVesting.overrideLockEndTimes[%i]"%cohort, linear_vesting.overrideLockEndTimes(users, [schedule[-1][0]] * cohort, [12 * 10**18] * cohort, {"from": accounts[0]}))
+  gas.record("esNUT.transferBatch[%i]"%cohort, esnut.transferBatch(users, [12 * 10**18] * cohort, {"from": accounts[0]}))
+  gas.record("ScheduledVesting.setSchedules[%i, 12]"%cohort, scheduled_vesting.setSchedules(users, [schedule] * cohort, {"from": accounts[0]}))
+
+def test_vesting_lens_gas(gas, esnut, linear_vesting, scheduled_vesting):
+  now = chain.time()
+  users = [accounts.add().address for i in range(100)]
+  schedule = [(now + (i + 1) * 30 * DAY, 10**18) for i in range(12)]
+  linear_vesting.overrideLockEndTimes(users, [schedule[-1][0]] * 100, [12 * 10**18] * 100, {"from": accounts[0]})
+  esnut.transferBatch(users, [12 * 10**18] * 100, {"from": accounts[0]})
+  scheduled_vesting.setSchedules(users, [schedule] * 100, {"from": accounts[0]})
+  lens = VestingLens.deploy({"from": accounts[0]})
+  gas.record("VestingLens.getVestingStatus[100, 12]", lens.getVestingStatus.estimate_gas(linear_vesting, scheduled_vesting, users))
+
+def distribution(depth):
+  from scripts.merkle import generateTree
+  rows = [("0x%040x"%(i + 1), 10**18) for i in range(2**depth)]
+  return rows, generateTree(rows)
+
+@pytest.mark.parametrize("depth", [1, 4, 10, 16])
+def test_merkle_claim_gas(gas, depth):
+  from scripts.merkle import encodeCompactClaim, CLAIM_COMPACT
+  rows, tree = distribution(depth)
+  token = NUT.deploy({'from': accounts[0]})
+  m = MerkleDistributor.deploy(token, tree.root(), {'from': accounts[0]})
+  token.mint(m, len(rows) * 10**18, {'from': accounts[0]})
+  for i, at in [(0, "first"), (len(rows) - 1, "last")]:
+    gas.record("MerkleDistributor.claim[depth %i, %s]"%(depth, at), m.claim(i, rows[i][0], rows[i][1], tree.proof(i), {'from': accounts[0]}))
+  gas.record("MerkleDistributor.rescueERC20[depth %i]"%depth, m.rescueERC20(token, accounts[0], {'from': accounts[0]}))
+
+  m = MerkleDistributor.deploy(token, tree.root(), {'from': accounts[0]})
+  token.mint(m, len(rows) * 10**18, {'from': accounts[0]})
+  for i, at in [(0, "first"), (len(rows) - 1, "last")]:
+    data = "0x" + (CLAIM_COMPACT + encodeCompactClaim(i, rows[i][0], rows[i][1], tree.proof(i))).hex()
+    gas.record("MerkleDistributor.claimCompact[depth %i, %s]"%(depth, at), accounts[0].transfer(m, 0, data = data))
+
+@pytest.mark.parametrize("depth", [1, 16])
+def test_distributor_factory_gas(gas, depth):
+  rows, tree = distribution(depth)
+  token = NUT.deploy({'from': accounts[0]})
+  gas.record("MerkleDistributor.deploy[depth %i]"%depth, MerkleDistributor.deploy(token, tree.root(), {'from': accounts[0]}).tx)
+  factory = MerkleDistributorFactory.deploy({'from': accounts[0]})
+  token.mint(accounts[0], len(rows) * 10**18, {'from': accounts[0]})
+  token.approve(factory, len(rows) * 10**18, {'from': accounts[0]})
+  tx = factory.createDistributor(token, tree.root(), accounts[0], "0x" + "%064x"%depth, len(rows) * 10**18, {'from': accounts[0]})
+  gas.record("MerkleDistributorFactory.createDistributor[depth %i, funded]"%depth, tx)
+  m = MerkleDistributorClone.at(tx.events["DistributorCreated"]["distributor"])
+  i = len(rows) - 1
+  gas.record("MerkleDistributorClone.claim[depth %i]"%depth, m.claim(i, rows[i][0], rows[i][1], tree.proof(i), {'from': accounts[0]}))
+
+@pytest.mark.parametrize("words", [16, 4096])
+def test_claimed_words_gas(gas, words):
+  m = MerkleDistributor.deploy(accounts[0], "0x" + "00" * 32, {'from': accounts[0]})
+  gas.record("MerkleDistributor.claimedWords[%i]"%words, m.claimedWords.estimate_gas(0, words))
+
+@pytest.mark.parametrize("depth", [1, 10, 16])
+def test_cumulative_claim_gas(gas, depth):
+  from scripts.merkle import generateTree
+  rows, tree = distribution(depth)
+  token = NUT.deploy({'from': accounts[0]})
+  m = CumulativeMerkleDistributor.deploy(token, tree.root(), {'from': accounts[0]})
+  token.mint(m, 2 * len(rows) * 10**18, {'from': accounts[0]})
+  i = len(rows) - 1
+  gas.record("CumulativeMerkleDistributor.claim[depth %i, first]"%depth, m.claim(i, rows[i][0], rows[i][1], tree.proof(i), {'from': accounts[0]}))
+  rows = [(addr, 2 * amt) for addr, amt in rows]
+  tree = generateTree(rows)
+  gas.record("CumulativeMerkleDistributor.setMerkleRoot[depth %i]"%depth, m.setMerkleRoot(tree.root(), {'from': accounts[0]}))
+  gas.record("CumulativeMerkleDistributor.claim[depth %i, next]"%depth, m.claim(i, rows[i][0], rows[i][1], tree.proof(i), {'from': accounts[0]}))
+
+@pytest.mark.parametrize("batch", [1, 8, 32])
+def test_merkle_batch_gas(gas, batch):
+  from scripts.merkle import getMultiProof
+  rows, tree = distribution(10)
+  token = NUT.deploy({'from': accounts[0]})
+  m = MerkleDistributor.deploy(token, tree.root(), {'from': accounts[0]})
+  token.mint(m, len(rows) * 10**18, {'from': accounts[0]})
+  multiclaim = MultiClaim.deploy({'from': accounts[0]})
+
+  spread = [i * 29 % len(rows) for i in range(batch)]
+  gas.record("MultiClaim.multiClaim[%i]"%batch, multiclaim.multiClaim([(m, i, rows[i][0], rows[i][1], tree.proof(i)) for i in spread], {'from': accounts[0]}))
+
+  indices, proof, flags = getMultiProof(tree, [(i + 512) % len(rows) for i in spread])
+  gas.record("MerkleDistributor.claimMulti[%i]"%batch, m.claimMulti(indices, [rows[i][0] for i in indices], [rows[i][1] for i in indices], proof, flags, {'from': accounts[0]}))
+
+  m = MerkleDistributor.deploy(token, tree.root(), {'from': accounts[0]})
+  token.mint(m, len(rows) * 10**18, {'from': accounts[0]})
+  contiguous = list(range(960, 960 + batch))
+  gas.record("MerkleDistributor.claimBatch[%i, contiguous]"%batch, m.claimBatch(contiguous, [rows[i][0] for i in contiguous], [rows[i][1] for i in contiguous], [tree.proof(i) for i in contiguous], {'from': accounts[0]}))
+  gas.record("MerkleDistributor.claimBatch[%i, spread]"%batch, m.claimBatch(spread, [rows[i][0] for i in spread], [rows[i][1] for i in spread], [tree.proof(i) for i in spread], {'from': accounts[0]}))
+
+@pytest.mark.parametrize("history", [1, 16, 64])
+def test_governor_gas(gas, esnut, history):
+  admin, voter = accounts[0], accounts[1]
+  timelock = TimelockController.deploy(DAY, [], [], admin, {"from": admin})
+  governor = NutGovernor.deploy(esnut, timelock, {"from": admin})
+  for role in ['PROPOSER_ROLE', 'CANCELLER_ROLE', 'EXECUTOR_ROLE']:
+    timelock.grantRole(Web3.keccak(text=role), governor, {"from": admin})
+  esnut.grantRole(esnut.DEFAULT_ADMIN_ROLE(), timelock, {"from": admin})
+
+  # Voter needs more than the 4% quorum of the supply minted to accounts[0]
+  esnut.delegate(voter, {"from": voter})
+  esnut.mint(voter, 1e26, {"from": admin})
+  while esnut.numCheckpoints(voter) < history:
+    esnut.mint(voter, 1, {"from": admin})
+
+  desc = "Mint 1e18 for accounts[2]"
+  call = [[esnut.address], [0], [esnut.mint.encode_input(accounts[2], 1e18)]]
+  proposalId = governor.hashProposal(*call, Web3.keccak(text=desc))
+  gas.record("NutGovernor.propose[history %i]"%history, governor.propose(*call, desc, {"from": voter}))
+  chain.mine(governor.votingDelay() + 1)
+  gas.record("NutGovernor.castVote[history %i]"%history, governor.castVote(proposalId, 1, {"from": voter}))
+  lens = GovernanceLens.deploy({"from": admin})
+  holders = [voter] + [accounts.add().address for i in range(99)]
+  gas.record("GovernanceLens.getAccountVotes[100, history %i]"%history, lens.getAccountVotes.estimate_gas(esnut, holders, chain.height - 1))
+  gas.record("GovernanceLens.getProposalVotes[100, history %i]"%history, lens.getProposalVotes.estimate_gas(governor, proposalId, holders))
+  chain.mine(governor.votingPeriod() + 1)
+  gas.record("NutGovernor.queue[history %i]"%history, governor.queue(*call, Web3.keccak(text=desc), {"from": voter}))
+  chain.sleep(DAY + 1)
+  gas.record("NutGovernor.execute[history %i]"%history, governor.execute(*call, Web3.keccak(text=desc), {"from": voter}))
@@ -92,3 +92,49 @@ def test_proposal_mint_tokens(user, admin, timelock, governor, esnut, NutGoverno
   governor.execute([esnut.address], [0], [esnut.mint.encode_input(user, 1e18)], Web3.keccak(text=desc), {"from": user})
   
   assert esnut.balanceOf(user) == 1e18
+
+def test_governance_lens(user, admin, governor, esnut, GovernanceLens, chain, a):
+  from scripts.governanceLens import accountVotes, proposalVotes
+  lens = GovernanceLens.deploy({"from": admin})
+  holders = [a[i] for i in range(1, 6)]
+  for i, holder in enumerate(holders):
+    esnut.mint(holder, (i + 1) * 1e18, {"from": admin})
+  esnut.mint(admin, 1e18, {"from": admin})
+  esnut.delegate(admin, {"from": admin})
+  for holder in holders[:3]:
+    esnut.delegate(holder, {"from": holder})
+  esnut.delegate(holders[0], {"from": holders[3]})
+  snapshot = chain.height
+  chain.mine(1)
+  esnut.mint(holders[0], 10e18, {"from": admin})
+
+  votes = accountVotes(lens, esnut, holders, snapshot, 2)
+  for holder in holders:
+    assert votes[holder.address] == {"balance": esnut.balanceOf(holder), "votes": esnut.getVotes(holder),
+                                     "pastVotes": esnut.getPastVotes(holder, snapshot), "delegatee": esnut.delegates(holder)}
+  assert votes[holders[0].address]["pastVotes"] == 5e18 and votes[holders[0].address]["votes"] == 15e18
+  assert votes[holders[4].address]["votes"] == 0 and votes[holders[4].address]["delegatee"] == brownie.ZERO_ADDRESS
+  assert accountVotes(lens, esnut, holders[:1], chain.height + 10)[holders[0].address]["pastVotes"] == 15e18
+
+  desc = "Mint 1e18 for user"
+  call = [[esnut.address], [0], [esnut.mint.encode_input(user, 1e18)]]
+  proposalId = governor.hashProposal(*call, Web3.keccak(text=desc))
+  governor.propose(*call, desc, {"from": admin})
+  chain.mine(governor.votingDelay() + 1)
+  governor.castVote(proposalId, 1, {"from": holders[0]})
+  governor.castVote(proposalId, 0, {"from": holders[1]})
+  governor.castVote(proposalId, 2, {"from": admin})
+
+  tally, receipts = proposalVotes(lens, governor, proposalId, [admin] + holders, 4)
+  assert tally["state"] == governor.state(proposalId) == 1  # Active
+  assert tally["snapshot"] == governor.proposalSnapshot(proposalId)
+  assert tally["quorum"] == governor.quorum(tally["snapshot"])
+  assert (tally["forVotes"], tally["againstVotes"], tally["abstainVotes"]) == (15e18, 2e18, 1e18)
+  assert receipts[holders[0].address] == {"hasVoted": True, "support": 1, "votes": 15e18}
+  assert receipts[holders[2].address] == {"hasVoted": False, "support": 0, "votes": 0}
+  for voter in [admin] + holders:
+    assert receipts[voter.address]["hasVoted"] == governor.hasVoted(proposalId, voter)
+
+  # Iterators are accepted as well as lists
+  assert proposalVotes(lens, governor, proposalId, (v for v in [admin] + holders), 4) == (tally, receipts)
+  assert accountVotes(lens, esnut, iter(holders), snapshot, 2) == votes
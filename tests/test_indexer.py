@@ -0,0 +1,65 @@
+# Event indexer against the local chain. Run with "brownie test tests/test_indexer.py -s".
+
+import brownie, pytest
+from scripts.eventIndexer import EventIndexer, openEventDB, MERKLE_EVENTS, LINEAR_VESTING_EVENTS, ESNUT_EVENTS
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+  pass
+
+def test_event_indexer(a, esNUT, NUT, LinearVesting, MerkleDistributor, chain, web3, tmp_path):
+  from scripts.merkle import generateTree, readRows
+  rows = list(readRows("scripts/list.txt"))
+  tree = generateTree(rows)
+  esnut = esNUT.deploy({"from": a[0]})
+  esnut.mint(a[0], 1e24, {"from": a[0]})
+  nut = NUT.at(esnut.nutToken())
+  m = MerkleDistributor.deploy(nut, tree.root(), {"from": a[0]})
+  esnut.grantRole(esnut.UNLOCK_ROLE(), a[0], {"from": a[0]})
+  esnut.unlockTo(a[0], m, 100e18, {"from": a[0]})
+  vesting = LinearVesting.deploy(esnut, {"from": a[0]})
+  esnut.grantRole(esnut.UNLOCK_ROLE(), vesting, {"from": a[0]})
+  esnut.grantRole(esnut.TRANSFER_ROLE(), vesting, {"from": a[0]})
+  start = chain.height
+
+  sources = {"week1": (m, MERKLE_EVENTS), "vesting": (vesting, LINEAR_VESTING_EVENTS), "esnut": (esnut, ESNUT_EVENTS)}
+  indexer = EventIndexer(web3, openEventDB(tmp_path / "events.sqlite"), sources, startBlock = start, maxRange = 4)
+  for i in range(3):
+    m.claim(i, rows[i][0], rows[i][1], tree.proof(i), {"from": a[0]})
+  esnut.transfer(a[1], 2e21, {"from": a[0]})
+  esnut.approve(vesting, 1e21, {"from": a[1]})
+  vesting.startVesting(1e21, {"from": a[1]})
+  esnut.delegate(a[1], {"from": a[1]})
+  esnut.setTokenLock(False, {"from": a[0]})
+  chain.sleep(86400)
+  vesting.claimVestedTokens({"from": a[1]})
+
+  assert indexer.sync() == 3 + 2 + 3
+  assert [(e["args"]["index"], e["args"]["account"].lower()) for e in indexer.events("Claimed")] == [(str(i), rows[i][0].lower()) for i in range(3)]
+  assert [e["event"] for e in indexer.events(account = a[1])] == ["StartLinearUnlock", "DelegateChanged", "DelegateVotesChanged", "LinearUnlocked"]
+  assert indexer.events("TokenLock")[0]["args"] == {"locked": False}
+  assert all(indexer.checkpoint(source) == chain.height for source in sources)
+
+  # A reorg replaces the last claim, its event is rolled back and the new one indexed
+  m.claim(5, rows[5][0], rows[5][1], tree.proof(5), {"from": a[0]})
+  assert indexer.sync() == 1
+  chain.undo()
+  m.claim(6, rows[6][0], rows[6][1], tree.proof(6), {"from": a[0]})
+  assert indexer.sync() == 1
+  assert [e["args"]["index"] for e in indexer.events("Claimed")] == ["0", "1", "2", "6"]
+
+  # A new indexer on the same database resumes from the checkpoints
+  resumed = EventIndexer(web3, openEventDB(tmp_path / "events.sqlite"), sources, startBlock = start)
+  assert resumed.sync() == 0
+  m.claim(7, rows[7][0], rows[7][1], tree.proof(7), {"from": a[0]})
+  assert resumed.sync() == 1 and len(resumed.events(source = "week1")) == 5
+
+  # A second source on the same contract stores its own copy of every event, leaving the first one's intact
+  overlapping = EventIndexer(web3, openEventDB(tmp_path / "events.sqlite"), {"week1": (m, MERKLE_EVENTS), "claims": (m, MERKLE_EVENTS)}, startBlock = start)
+  assert overlapping.sync() == 5
+  assert len(overlapping.events(source = "week1")) == 5 and len(overlapping.events(source = "claims")) == 5
+
+  # Undoing the last claim leaves the chain shorter than the last recorded block, the claim is rolled back
+  chain.undo()
+  assert overlapping.sync() == 0
+  assert len(overlapping.events(source = "week1")) == 4 and len(overlapping.events(source = "claims")) == 4
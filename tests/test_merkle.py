@@ -2,7 +2,7 @@
 # "-s" allows standard output to reach user, for visual comfort. 
 
 
-import json, brownie, pytest
+import os, json, io, brownie, pytest
 
 def test_basic_deposit_and_withdrawal(a, NUT, MerkleDistributor):
   FN = "scripts/list.txt"
@@ -22,6 +22,300 @@ def test_basic_deposit_and_withdrawal(a, NUT, MerkleDistributor):
     if nuts.balanceOf(addr) != int(amt): raise Exception("nuts mismatch %i vs %i"%(nuts.balanceOf(addr), int(amt)))
     else: print("Account %i has received correct number of tokens"%(i))
 
+def test_claim_multi(a, NUT, MerkleDistributor):
+  from scripts.merkle import generateTree, readRows, getMultiProof
+  rows = list(readRows("scripts/list.txt"))
+  tree = generateTree(rows)
+  nuts = NUT.deploy({"from": a[0]})
+  m = MerkleDistributor.deploy(nuts, tree.root(), {"from": a[0]})
+  nuts.mint(m, 100e18, {"from": a[0]})
+  indices, proof, flags = getMultiProof(tree, [9, 2, 3, 6])
+  assert indices == [2, 3, 6, 9]
+  with brownie.reverts("MerkleDistributor: Invalid proof."):
+    m.claimMulti(indices, [rows[i][0] for i in indices], [rows[i][1] + 1 for i in indices], proof, flags, {"from": a[0]})
+  tx = m.claimMulti(indices, [rows[i][0] for i in indices], [rows[i][1] for i in indices], proof, flags, {"from": a[0]})
+  assert len(tx.events["Claimed"]) == 4
+  for i in indices:
+    assert m.isClaimed(i) and nuts.balanceOf(rows[i][0]) == rows[i][1]
+  with brownie.reverts("MerkleDistributor: Drop already claimed."):
+    m.claimMulti(indices, [rows[i][0] for i in indices], [rows[i][1] for i in indices], proof, flags, {"from": a[0]})
+  m.claim(0, rows[0][0], rows[0][1], tree.proof(0), {"from": a[0]})
+  assert nuts.balanceOf(rows[0][0]) == rows[0][1]
+
+def test_claim_batch(a, NUT, MerkleDistributor):
+  from scripts.merkle import generateTree
+  rows = [("0x%040x"%(1 + i // 4), 10**18 + i) for i in range(600)]
+  tree = generateTree(rows)
+  nuts = NUT.deploy({"from": a[0]})
+  m = MerkleDistributor.deploy(nuts, tree.root(), {"from": a[0]})
+  nuts.mint(m, 1000e18, {"from": a[0]})
+  indices = list(range(250, 270)) + [3]
+  args = lambda indices: ([rows[i][0] for i in indices], [rows[i][1] for i in indices], [tree.proof(i) for i in indices])
+  with brownie.reverts("MerkleDistributor: Invalid proof."):
+    m.claimBatch(indices, *args(indices[1:] + indices[:1]), {"from": a[0]})
+  with brownie.reverts("MerkleDistributor: Drop already claimed."):
+    m.claimBatch(indices + [251], *args(indices + [251]), {"from": a[0]})
+  tx = m.claimBatch(indices, *args(indices), {"from": a[0]})
+  assert len(tx.events["Claimed"]) == len(indices)
+  assert len(tx.events["Transfer"]) == 7  # accounts of 248-251, 252-255, ..., 268-271, 0-3
+  for i in range(600):
+    assert m.isClaimed(i) == (i in indices)
+  assert nuts.balanceOf(rows[260][0]) == sum(rows[i][1] for i in range(260, 264))
+  assert nuts.balanceOf(rows[3][0]) == rows[3][1]
+  with brownie.reverts("MerkleDistributor: Drop already claimed."):
+    m.claimBatch([255], *args([255]), {"from": a[0]})
+  m.claimBatch([], [], [], [], {"from": a[0]})
+
+def test_claimed_words(a, NUT, MerkleDistributor):
+  from scripts.merkle import generateTree
+  from scripts.claimStatus import claimStatus, claimsFromRows
+  rows = [("0x%040x"%(1 + i), 10**18 + i) for i in range(600)]
+  tree = generateTree(rows)
+  nuts = NUT.deploy({"from": a[0]})
+  m = MerkleDistributor.deploy(nuts, tree.root(), {"from": a[0]})
+  nuts.mint(m, 1000e18, {"from": a[0]})
+  indices = [0, 3, 255, 256, 511, 599]
+  m.claimBatch(indices, [rows[i][0] for i in indices], [rows[i][1] for i in indices], [tree.proof(i) for i in indices], {"from": a[0]})
+  words, count = m.claimedWords(0, 4)
+  assert list(words) == [1 | 1 << 3 | 1 << 255, 1 | 1 << 255, 1 << 87, 0] and count == 6
+  assert m.claimedWords(1, 1) == ([1 | 1 << 255], 2)
+  status = claimStatus(m, claimsFromRows(rows), batchSize = 2)
+  assert [i for i, addr, amt in status["claimed"]] == indices and status["claimedCount"] == 6
+  assert len(status["unclaimed"]) == 594
+  assert status["unclaimedAmount"] == nuts.balanceOf(m) - (1000 * 10**18 - sum(amt for addr, amt in rows))
+
+def test_claim_compact(a, NUT, MerkleDistributor, MultiClaim):
+  from scripts.merkle import generateTree, readRows, encodeCompactClaim, encodeCompactMultiClaim, CLAIM_COMPACT
+  rows = list(readRows("scripts/list.txt"))
+  tree = generateTree(rows)
+  nuts = NUT.deploy({"from": a[0]})
+  m = MerkleDistributor.deploy(nuts, tree.root(), {"from": a[0]})
+  nuts.mint(m, 100e18, {"from": a[0]})
+  data = lambda i, amt: "0x" + (CLAIM_COMPACT + encodeCompactClaim(i, rows[i][0], amt, tree.proof(i))).hex()
+  with brownie.reverts("MerkleDistributor: Invalid proof."): a[0].transfer(m, 0, data = data(1, rows[1][1] + 1))
+  with brownie.reverts("MerkleDistributor: Invalid calldata."): a[0].transfer(m, 0, data = data(1, rows[1][1])[:-2])
+  tx = a[0].transfer(m, 0, data = data(1, rows[1][1]))
+  assert tx.events["Claimed"]["index"] == 1 and nuts.balanceOf(rows[1][0]) == rows[1][1]
+  with brownie.reverts("MerkleDistributor: Drop already claimed."): a[0].transfer(m, 0, data = data(1, rows[1][1]))
+
+  multi = MultiClaim.deploy({"from": a[0]})
+  claims = [(m.address, i, rows[i][0], rows[i][1], tree.proof(i)) for i in [0, 5, 9]]
+  with brownie.reverts("MerkleDistributor: Drop already claimed."):
+    a[0].transfer(multi, 0, data = "0x" + encodeCompactMultiClaim(claims + [(m.address, 1, rows[1][0], rows[1][1], tree.proof(1))]).hex())
+  tx = a[0].transfer(multi, 0, data = "0x" + encodeCompactMultiClaim(claims).hex())
+  assert len(tx.events["Claimed"]) == 3
+  for i in [0, 5, 9]:
+    assert m.isClaimed(i) and nuts.balanceOf(rows[i][0]) == rows[i][1]
+  with pytest.raises(ValueError): encodeCompactClaim(1 << 32, rows[0][0], 1, [])
+
+def test_claim_relayer(a, NUT, MerkleDistributor, MultiClaim):
+  from scripts.merkle import generateTree
+  from scripts.claimRelayer import relay, unclaimed
+  rows = [("0x%040x"%(1 + i), 10**18 + i) for i in range(60)]
+  tree = generateTree(rows)
+  nuts = NUT.deploy({"from": a[0]})
+  m = MerkleDistributor.deploy(nuts, tree.root(), {"from": a[0]})
+  nuts.mint(m, 100e18, {"from": a[0]})
+  multi = MultiClaim.deploy({"from": a[0]})
+  for i in [3, 10]: m.claim(i, rows[i][0], rows[i][1], tree.proof(i), {"from": a[0]})
+
+  # Index 40 has a wrong amount, its batches fail and are bisected down to it
+  claims = [(m, i, rows[i][0], rows[i][1] + (i == 40), tree.proof(i)) for i in range(60)]
+  report = relay(claims, multi, a[1], 1000000)
+  assert report["alreadyClaimed"] == 2 and [c[1] for c in report["failed"]] == [40]
+  assert sorted(c[1] for c in report["claimed"]) == [i for i in range(60) if i not in (3, 10, 40)]
+  assert len(report["txs"]) > 2 and report["rounds"] > 1 and report["stuckNonce"] is None
+  for i in range(60):
+    assert m.isClaimed(i) == (i != 40)
+  assert nuts.balanceOf(m) == 100e18 - sum(amt for addr, amt in rows) + rows[40][1]
+  assert relay(claims, multi, a[1])["alreadyClaimed"] == 59
+
+  # Distributors deployed before claimedWords are read with isClaimed
+  old = brownie.Contract.from_abi("OldDistributor", m.address, [item for item in m.abi if item.get("name") != "claimedWords"])
+  assert [c[1] for c in unclaimed([(old,) + c[1:] for c in claims])] == [40]
+
+def test_distributor_factory(a, NUT, MerkleDistributorFactory, MerkleDistributorClone):
+  from scripts.merkle import generateTree, readRows
+  from scripts.distributorFactory import predictDistributor, deployClone
+  rows = list(readRows("scripts/list.txt"))
+  tree = generateTree(rows)
+  nuts = NUT.deploy({"from": a[0]})
+  factory = MerkleDistributorFactory.deploy({"from": a[0]})
+  nuts.mint(a[0], 100e18, {"from": a[0]})
+  nuts.approve(factory, 100e18, {"from": a[0]})
+  predicted = predictDistributor(factory, nuts, tree.root(), a[1], "week1")
+  assert predicted != predictDistributor(factory, nuts, tree.root(), a[0], "week1")
+  m = deployClone(factory, nuts, tree.root(), a[1], "week1", 100e18, {"from": a[0]})
+  assert m.address == predicted and nuts.balanceOf(m) == 100e18
+  assert m.token() == nuts and m.merkleRoot() == tree.root() and m.owner() == a[1]
+
+  with brownie.reverts("MerkleDistributor: Invalid proof."): m.claim(1, rows[1][0], rows[1][1] + 1, tree.proof(1), {"from": a[0]})
+  m.claim(1, rows[1][0], rows[1][1], tree.proof(1), {"from": a[0]})
+  assert m.isClaimed(1) and nuts.balanceOf(rows[1][0]) == rows[1][1]
+  with brownie.reverts("MerkleDistributor: Drop already claimed."): m.claim(1, rows[1][0], rows[1][1], tree.proof(1), {"from": a[0]})
+
+  with brownie.reverts("Initializable: contract is already initialized"): m.initialize(nuts, "0x" + "00" * 32, a[0], {"from": a[0]})
+  implementation = MerkleDistributorClone.at(factory.implementation())
+  with brownie.reverts("Initializable: contract is already initialized"): implementation.initialize(nuts, tree.root(), a[0], {"from": a[0]})
+
+  # Same name, token, root and owner cannot be deployed twice
+  with brownie.reverts(): deployClone(factory, nuts, tree.root(), a[1], "week1", 0, {"from": a[0]})
+  with brownie.reverts("Ownable: caller is not the owner"): m.rescueERC20(nuts, a[0], {"from": a[0]})
+  m.rescueERC20(nuts, a[2], {"from": a[1]})
+  assert nuts.balanceOf(a[2]) == 100e18 - rows[1][1]
+
+def test_cumulative_distributor(a, NUT, CumulativeMerkleDistributor):
+  from scripts.merkle import generateTree
+  from scripts.cumulative import cumulativeRows
+  users = [a[i].address for i in range(1, 4)]
+  weeks = [{users[0]: {"week_incentive": 10}, users[1]: {"week_incentive": 20}},
+           {users[0]: {"week_incentive": 5}, users[2].lower(): {"week_incentive": 7}},
+           {users[1]: {"week_incentive": 1}, users[2]: {"week_incentive": "3"}}]
+  nuts = NUT.deploy({"from": a[0]})
+  rows = cumulativeRows(weeks[:1])
+  tree = generateTree(rows)
+  m = CumulativeMerkleDistributor.deploy(nuts, tree.root(), {"from": a[0]})
+  nuts.mint(m, 30, {"from": a[0]})
+  tx = m.claim(0, rows[0][0], rows[0][1], tree.proof(0), {"from": a[5]})
+  assert tx.events["Claimed"]["amount"] == 10 and nuts.balanceOf(users[0]) == 10
+  with brownie.reverts("CumulativeMerkleDistributor: Nothing to claim."):
+    m.claim(0, rows[0][0], rows[0][1], tree.proof(0), {"from": a[5]})
+
+  for week in [2, 3]:
+    rows = cumulativeRows(weeks[:week])
+    tree = generateTree(rows)
+    with brownie.reverts("Ownable: caller is not the owner"): m.setMerkleRoot(tree.root(), {"from": a[5]})
+    m.setMerkleRoot(tree.root(), {"from": a[0]})
+    nuts.mint(m, sum(int(v["week_incentive"]) for v in weeks[week - 1].values()), {"from": a[0]})
+  assert m.round() == 3 and rows == [(users[0], 15), (users[1], 21), (users[2].lower(), 10)]
+  with brownie.reverts("CumulativeMerkleDistributor: Invalid proof."):
+    m.claim(1, rows[1][0], rows[1][1] + 1, tree.proof(1), {"from": a[5]})
+  for i in range(3):
+    m.claim(i, rows[i][0], rows[i][1], tree.proof(i), {"from": a[5]})
+    assert m.cumulativeClaimed(users[i]) == rows[i][1] and nuts.balanceOf(users[i]) == rows[i][1]
+  assert nuts.balanceOf(m) == 0
+
+def test_cumulative_rows():
+  from scripts.cumulative import cumulativeRows, checkMonotonic
+  rows = cumulativeRows([{"0xAb": {"week_incentive": 1}, "0xcd": {"week_incentive": 2}}, {"0xab": {"week_incentive": "4"}, "0xef": {"week_incentive": 8}}])
+  assert rows == [("0xAb", 5), ("0xcd", 2), ("0xef", 8)]
+  assert checkMonotonic(rows, {"0xab": 5, "0xcd": 3, "0x12": 1}) == ["0xcd", "0x12"]
+
+def test_claimed_indices():
+  from scripts.claimStatus import claimedIndices, isClaimedIn
+  words = [1 | 1 << 255, 0, 1 << 7]
+  assert claimedIndices(words) == {0, 255, 519}
+  assert isClaimedIn(words, 255) and not isClaimedIn(words, 256)
+
+def test_tree_matches_published():
+  from scripts.merkle import readRows, hashRows, buildTree, writeTree, writeProofs
+  FN = "scripts/list.txt"
+  levels = buildTree(hashRows(readRows(FN)))
+  tree, proofs = io.StringIO(), io.StringIO()
+  writeTree(tree, levels)
+  writeProofs(proofs, levels, 10)
+  assert tree.getvalue() == open(FN + ".proofTree.json", "r").read()
+  assert proofs.getvalue() == open(FN + ".proof.json", "r").read()
+
+def test_claim_with_binary_tree(a, NUT, MerkleDistributor, tmp_path):
+  from scripts.merkle import readRows, hashRows, buildTree, writeTreeBin, ProofTree
+  FN = "scripts/list.txt"
+  levels = buildTree(hashRows(readRows(FN)))
+  with open(tmp_path / "list.txt.proofTree.bin", "wb") as f: writeTreeBin(f, levels, 10)
+  proofs = json.load(open(FN + ".proof.json", "r"))
+  with ProofTree(tmp_path / "list.txt.proofTree.bin") as tree:
+    assert tree.leafCount == 10
+    assert tree.root() == json.load(open(FN + ".proofTree.json", "r"))[-1][0]
+    nuts = NUT.deploy({"from": a[0]})
+    m = MerkleDistributor.deploy(nuts, tree.root(), {"from": a[0]})
+    nuts.mint(m, 100e18, {"from": a[0]})
+    for i, (addr, amt) in enumerate(readRows(FN)):
+      assert tree.proof(i) == proofs[i]
+      m.claim(i, addr, amt, tree.proof(i), {"from": a[0]})
+      assert nuts.balanceOf(addr) == amt
+    with pytest.raises(IndexError): tree.proof(10)
+
+def test_cached_rebuild(tmp_path):
+  from scripts.merkle import readRows, hashRows, buildTree, buildCached
+  rows = list(readRows("scripts/list.txt"))
+  levels, leafCount = buildCached(rows, "list", tmp_path)
+  assert levels == buildTree(hashRows(rows)) and leafCount == 10
+
+  # Corrected amount and appended addresses, patched from the previous build
+  rows[4] = (rows[4][0], rows[4][1] + 1)
+  rows += [("0x%040x"%i, i) for i in range(1, 4)]
+  levels, leafCount = buildCached(rows, "list", tmp_path)
+  assert levels == buildTree(hashRows(rows)) and leafCount == 13
+
+def test_generate_tree_in_process(tmp_path):
+  from scripts.merkle import generateTree, readRows, ProofTree, placeHolder, keccak, LEAF_SIZE
+  FN = "scripts/list.txt"
+  assert placeHolder == keccak((2**256-1).to_bytes(32, "big") + bytes(LEAF_SIZE - 32))
+  tree = generateTree(readRows(FN))
+  assert tree.root() == json.load(open(FN + ".proofTree.json", "r"))[-1][0]
+  assert [tree.proof(i) for i in range(tree.leafCount)] == json.load(open(FN + ".proof.json", "r"))
+  tree.writeBin(tmp_path / "list.txt.proofTree.bin")
+  with ProofTree(tmp_path / "list.txt.proofTree.bin") as stored:
+    assert stored.root() == tree.root() and stored.proof(9) == tree.proof(9)
+
+def test_offline_verification():
+  from scripts.merkle import readRows, verifyClaims
+  FN = "scripts/list.txt"
+  root = json.load(open(FN + ".proofTree.json", "r"))[-1][0]
+  proofs = json.load(open(FN + ".proof.json", "r"))
+  claims = [(i, addr, amt, proofs[i]) for i, (addr, amt) in enumerate(readRows(FN))]
+  assert verifyClaims(root, claims) == []
+  claims[3] = (3, claims[3][1], claims[3][2] + 1, claims[3][3])
+  claims[7] = (7, claims[7][1], claims[7][2], proofs[6])
+  assert verifyClaims(root, claims, jobs = 2, batchSize = 4) == [3, 7]
+
+def test_proof_shards(tmp_path):
+  from scripts.merkle import generateTree
+  from scripts.proofShards import writeShards, findClaim
+  rows = [("0x%040x"%(i * 7919 << 120), i + 1) for i in range(300)]
+  tree = generateTree(rows)
+  out = tmp_path / "week1.shards"
+  assert writeShards(out, tree, rows, 16, distributor = "0x9FB3985b1FAD450C2F4742dd29DBA5380ac7dDe1") > 16
+  manifest = json.load(open(out / "manifest.json"))
+  assert manifest["root"] == tree.root() and manifest["distributor"] == "0x9FB3985b1FAD450C2F4742dd29DBA5380ac7dDe1"
+  for prefix in manifest["shards"]:
+    assert len(json.load(open(out / ("shard_%s.json"%prefix)))) <= 16
+  for i in [0, 1, 150, 299]:
+    assert findClaim(out, rows[i][0].upper().replace("0X", "0x")) == (i, rows[i][1], tree.proof(i))
+  assert findClaim(out, "0x%040x"%1) is None
+
+  # Rewriting with other prefixes leaves no stale shard behind
+  shards = writeShards(out, tree, rows, 128)
+  assert sorted(os.listdir(out)) == sorted(["manifest.json"] + ["shard_%s.json"%prefix for prefix in json.load(open(out / "manifest.json"))["shards"]])
+  assert len(os.listdir(out)) == shards + 1 and sorted(os.listdir(tmp_path)) == ["week1.shards"]
+
+def test_proof_index(tmp_path, monkeypatch):
+  from scripts.merkle import readRows, hashRows, buildTree, writeTreeBin
+  from scripts.proofIndex import openIndex, indexDistribution, indexProofJSON, lookup
+  FN = "scripts/list.txt"
+  rows = list(readRows(FN))
+  levels = buildTree(hashRows(rows))
+  with open(tmp_path / "list.txt.proofTree.bin", "wb") as f: writeTreeBin(f, levels, len(rows))
+  proofs = json.load(open(FN + ".proof.json", "r"))
+
+  db = openIndex(tmp_path / "index.sqlite")
+  indexDistribution(db, "week1", "0x9FB3985b1FAD450C2F4742dd29DBA5380ac7dDe1", rows, tmp_path / "list.txt.proofTree.bin")
+  json.dump({rows[3][0]: {"week_incentive": "7", "index": 0, "proof": ["0x01"]}}, open(tmp_path / "week2.proof.json", "w"))
+  indexProofJSON(db, "week2", "0x8075d95BF16215e356E97eE74A592c675dCc8D65", tmp_path / "week2.proof.json")
+
+  claims = lookup(db, rows[3][0].upper().replace("0X", "0x"))
+  assert [(c["distribution"], c["index"], c["amount"]) for c in claims] == [("week1", 3, str(rows[3][1])), ("week2", 0, "7")]
+  assert claims[0]["proof"] == proofs[3]
+  assert claims[1]["proof"] == ["0x01"]
+  assert lookup(db, "0x0000000000000000000000000000000000000001") == []
+
+  # Tree paths are relative to the database, so lookups work from any directory, and a missing tree names its distribution
+  monkeypatch.chdir(tmp_path)
+  assert db.execute("SELECT treeFile FROM distributions WHERE name = 'week1'").fetchone()[0] == "list.txt.proofTree.bin"
+  assert lookup(db, rows[3][0])[0]["proof"] == proofs[3]
+  os.remove(tmp_path / "list.txt.proofTree.bin")
+  with pytest.raises(FileNotFoundError, match = "week1"): lookup(db, rows[3][0])
+
 """
 import json
 FN = "scripts/ARBITRUM_INCENTIVE_JAN_29_FEB_02.csv"
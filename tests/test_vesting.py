@@ -109,4 +109,195 @@ def test_two_full_vestings_90_days_apart():
     # Check balances
     assert esnut.balanceOf(linearVesting) == 0
     assert esnut.balanceOf(accounts[3]) == 0
-    assert nut.balanceOf(accounts[3]) == 2e26  # All esNUT should be converted to NUT without penalty
\ No newline at end of file
+    assert nut.balanceOf(accounts[3]) == 2e26  # All esNUT should be converted to NUT without penalty
+
+# Schedules are overwritten in place and vested entries are skipped by the cursor
+def test_schedule_cursor():
+    esnut = esNUT.deploy({'from': accounts[0]})
+    esnut.mint(accounts[0], 1e28, {"from": accounts[0]})
+    nut = NUT.at(esnut.nutToken())
+    linearVesting = LinearVesting.deploy(esnut, {"from": accounts[0]})
+    scheduledVesting = ScheduledVesting.deploy(esnut, linearVesting, {"from": accounts[0]})
+    esnut.grantRole(esnut.UNLOCK_ROLE(), scheduledVesting, {"from": accounts[0]})
+
+    day = 60 * 60 * 24
+    now = chain.time()
+    schedule = [(now + (i + 1) * day, (i + 1) * 10**18) for i in range(5)]
+    linearVesting.overrideLockEndTime(accounts[1], schedule[-1][0], 15 * 10**18, {"from": accounts[0]})
+    esnut.transfer(accounts[1], 15 * 10**18, {"from": accounts[0]})
+    scheduledVesting.setSchedule(accounts[1], schedule, {"from": accounts[0]})
+    assert scheduledVesting.scheduleCursors(accounts[1]) == (0, 5)
+
+    # Entries 0 to 2 are due
+    chain.mine(timestamp=schedule[2][0])
+    scheduledVesting.vestTokens(accounts[1])
+    assert nut.balanceOf(accounts[1]) == 6 * 10**18
+    assert scheduledVesting.scheduleCursors(accounts[1]) == (3, 5)
+    assert [scheduledVesting.schedules(accounts[1], i)[1] for i in range(5)] == [0, 0, 0, 4 * 10**18, 5 * 10**18]
+    assert "ScheduledUnlock" not in scheduledVesting.vestTokens(accounts[1]).events
+
+    # A shorter schedule replaces the remaining entries, vesting what is due first
+    chain.mine(timestamp=schedule[3][0])
+    newSchedule = [(schedule[3][0] + day, 2 * 10**18), (schedule[3][0] + 2 * day, 10**18)]
+    linearVesting.overrideLockEndTime(accounts[1], newSchedule[-1][0], 3 * 10**18, {"from": accounts[0]})
+    scheduledVesting.setSchedule(accounts[1], newSchedule, {"from": accounts[0]})
+    assert nut.balanceOf(accounts[1]) == 10 * 10**18
+    assert scheduledVesting.scheduleCursors(accounts[1]) == (0, 2)
+    assert scheduledVesting.schedules(accounts[1], 1) == newSchedule[1]
+    with brownie.reverts("ScheduledVesting: Index out of bounds"):
+        scheduledVesting.schedules(accounts[1], 2)
+
+    chain.mine(timestamp=newSchedule[0][0])
+    scheduledVesting.cancelSchedule(accounts[1], {"from": accounts[0]})
+    assert nut.balanceOf(accounts[1]) == 12 * 10**18
+    assert scheduledVesting.scheduleCursors(accounts[1]) == (0, 0)
+    chain.mine(timestamp=newSchedule[1][0])
+    scheduledVesting.vestTokens(accounts[1])
+    assert nut.balanceOf(accounts[1]) == 12 * 10**18
+
+
+# Cohort onboarding with batch locks, funding and schedules
+def test_batch_onboarding():
+    from scripts.onboard import onboard
+    esnut = esNUT.deploy({'from': accounts[0]})
+    esnut.mint(accounts[0], 1e28, {"from": accounts[0]})
+    nut = NUT.at(esnut.nutToken())
+    linearVesting = LinearVesting.deploy(esnut, {"from": accounts[0]})
+    scheduledVesting = ScheduledVesting.deploy(esnut, linearVesting, {"from": accounts[0]})
+    esnut.grantRole(esnut.UNLOCK_ROLE(), scheduledVesting, {"from": accounts[0]})
+
+    day = 60 * 60 * 24
+    now = chain.time()
+    cohort = {accounts.add().address: [(now + (j + 1) * 30 * day, (i + 1) * 10**18) for j in range(i % 4 + 1)] for i in range(25)}
+    txs = onboard(cohort, esnut, linearVesting, scheduledVesting, accounts[0], 10)
+    assert len(txs) == 9
+    for addr, schedule in cohort.items():
+        total = sum(amt for t, amt in schedule)
+        assert linearVesting.lockSchedules(addr) == (0, schedule[-1][0], total)
+        assert esnut.balanceOf(addr) == total
+        assert scheduledVesting.scheduleCursors(addr) == (0, len(schedule))
+        assert scheduledVesting.schedules(addr, len(schedule) - 1) == schedule[-1]
+
+    chain.mine(timestamp=now + 30 * day)
+    addr = list(cohort)[3]
+    scheduledVesting.vestTokens(addr)
+    assert nut.balanceOf(addr) == 4 * 10**18
+
+    # Every schedule of a batch is validated, and one bad schedule reverts the batch
+    users = [accounts.add().address for i in range(3)]
+    schedule = [(now + 60 * day, 10**18), (now + 90 * day, 10**18)]
+    with brownie.reverts("LinearVesting: Length mismatch"):
+        linearVesting.overrideLockEndTimes(users, [schedule[-1][0]] * 3, [2 * 10**18] * 2, {"from": accounts[0]})
+    with brownie.reverts():
+        linearVesting.overrideLockEndTimes(users, [schedule[-1][0]] * 3, [2 * 10**18] * 3, {"from": accounts[1]})
+    linearVesting.overrideLockEndTimes(users, [schedule[-1][0]] * 3, [2 * 10**18] * 3, {"from": accounts[0]})
+    esnut.transferBatch(users[:2], [2 * 10**18] * 2, {"from": accounts[0]})
+    with brownie.reverts("ScheduledVesting: Insufficient esNUT to lock"):
+        scheduledVesting.setSchedules(users, [schedule] * 3, {"from": accounts[0]})
+    with brownie.reverts("ScheduledVesting: Schedule timestamps must be in sequential order"):
+        scheduledVesting.setSchedules(users[:2], [schedule, schedule[::-1]], {"from": accounts[0]})
+    with brownie.reverts("ScheduledVesting: Length mismatch"):
+        scheduledVesting.setSchedules(users[:2], [schedule], {"from": accounts[0]})
+    scheduledVesting.setSchedules(users[:2], [schedule] * 2, {"from": accounts[0]})
+    assert scheduledVesting.scheduleCursors(users[1]) == (0, 2)
+    assert scheduledVesting.scheduleCursors(users[2]) == (0, 0)
+
+    # setSchedules reads the locks and balances of the whole batch at once
+    assert linearVesting.lockSchedulesOf(users) == [linearVesting.lockSchedules(u) for u in users]
+    assert esnut.balancesOf(users) == [2 * 10**18, 2 * 10**18, 0]
+    # An account repeated in a batch is checked against its balance after the first entry unlocked its due tranche
+    chain.mine(timestamp=now + 61 * day)
+    with brownie.reverts("ScheduledVesting: Insufficient esNUT to lock"):
+        scheduledVesting.setSchedules([users[0], users[0]], [schedule] * 2, {"from": accounts[0]})
+
+# Vested NUT is minted straight to the user, without passing through LinearVesting
+def test_unlock_to_recipient():
+    esnut = esNUT.deploy({'from': accounts[0]})
+    esnut.mint(accounts[0], 1e28, {"from": accounts[0]})
+    nut = NUT.at(esnut.nutToken())
+    linearVesting = LinearVesting.deploy(esnut, {"from": accounts[0]})
+    esnut.grantRole(esnut.UNLOCK_ROLE(), linearVesting, {"from": accounts[0]})
+    esnut.grantRole(esnut.TRANSFER_ROLE(), linearVesting, {"from": accounts[0]})
+
+    with brownie.reverts():
+        esnut.unlockTo(accounts[0], accounts[1], 1e18, {"from": accounts[1]})
+    esnut.grantRole(esnut.UNLOCK_ROLE(), accounts[0], {"from": accounts[0]})
+    with brownie.reverts("veNUTS: Insufficient Balance to unlock"):
+        esnut.unlockTo(accounts[2], accounts[1], 1e18, {"from": accounts[0]})
+    esnut.unlockTo(accounts[0], accounts[1], 1e18, {"from": accounts[0]})
+    assert nut.balanceOf(accounts[1]) == 1e18 and esnut.balanceOf(accounts[0]) == 1e28 - 1e18
+
+    esnut.transfer(accounts[3], 1e24, {"from": accounts[0]})
+    esnut.approve(linearVesting, 1e24, {'from': accounts[3]})
+    linearVesting.startVesting(1e24, {'from': accounts[3]})
+    chain.mine(timestamp=linearVesting.vestingSchedules(accounts[3])[0] + 60 * 60 * 24 * 45)
+    tx = linearVesting.claimVestedTokens({'from': accounts[3]})
+    claimed = tx.events["LinearUnlocked"]["unlockedAmount"]
+    assert claimed > 0 and nut.balanceOf(accounts[3]) == claimed
+    assert [(e["from"], e["to"]) for e in tx.events["Transfer"]] == [(linearVesting.address, brownie.ZERO_ADDRESS), (brownie.ZERO_ADDRESS, accounts[3].address)]
+
+    # With a 100% penalty there is nothing to refund, and no unlock is made
+    linearVesting.setMinPenalty(1e18, {"from": accounts[0]})
+    tx = linearVesting.earlyWithdraw({'from': accounts[3]})
+    assert tx.events["EarlyLinearUnlock"]["returnedAmount"] == 0
+    assert nut.balanceOf(accounts[3]) == claimed + sum(e["unlockedAmount"] for e in tx.events["LinearUnlocked"])
+    assert nut.balanceOf(linearVesting) == 0 and esnut.balanceOf(linearVesting) == 0
+
+# Batch status through VestingLens matches what the vesting transactions pay
+def test_vesting_lens():
+    from brownie import VestingLens
+    from scripts.vestingLens import vestingStatus
+    esnut = esNUT.deploy({'from': accounts[0]})
+    esnut.mint(accounts[0], 1e28, {"from": accounts[0]})
+    linearVesting = LinearVesting.deploy(esnut, {"from": accounts[0]})
+    scheduledVesting = ScheduledVesting.deploy(esnut, linearVesting, {"from": accounts[0]})
+    esnut.grantRole(esnut.UNLOCK_ROLE(), linearVesting, {"from": accounts[0]})
+    esnut.grantRole(esnut.TRANSFER_ROLE(), linearVesting, {"from": accounts[0]})
+    esnut.grantRole(esnut.UNLOCK_ROLE(), scheduledVesting, {"from": accounts[0]})
+    lens = VestingLens.deploy({"from": accounts[0]})
+
+    day = 60 * 60 * 24
+    now = chain.time()
+    schedule = [(now + 20 * day, 10**18), (now + 40 * day, 2 * 10**18), (now + 60 * day, 3 * 10**18)]
+    linearVesting.overrideLockEndTime(accounts[2], schedule[-1][0], 6 * 10**18, {"from": accounts[0]})
+    esnut.transfer(accounts[2], 6 * 10**18, {"from": accounts[0]})
+    scheduledVesting.setSchedule(accounts[2], schedule, {"from": accounts[0]})
+
+    esnut.transfer(accounts[1], 9e20, {"from": accounts[0]})
+    esnut.approve(linearVesting, 9e20, {'from': accounts[1]})
+    start = linearVesting.startVesting(9e20, {'from': accounts[1]}).timestamp
+    chain.mine(timestamp=start + 30 * day)
+
+    users = [accounts[1], accounts[2], accounts[3]]
+    status = vestingStatus(lens, linearVesting, scheduledVesting, users, 2)
+    vesting = status[accounts[1].address]
+    assert vesting["vestingStart"] == start and vesting["esnutVesting"] == 9e20 and vesting["esnutBalance"] == 0
+    assert vesting["claimable"] == pytest.approx(3e20, rel=1e-4)
+    assert vesting["earlyWithdrawPenalty"] == pytest.approx(4e20, rel=1e-4)
+    assert vesting["claimable"] + vesting["earlyWithdrawPenalty"] + vesting["earlyWithdrawRefund"] == 9e20
+    assert not vesting["locked"] and vesting["lockedUntil"] == 0 and vesting["scheduleRemaining"] == 0
+
+    scheduled = status[accounts[2].address]
+    assert scheduled["locked"] and scheduled["adminLock"] and scheduled["lockedUntil"] == schedule[-1][0]
+    assert scheduled["esnutLocked"] == 6 * 10**18 and scheduled["esnutBalance"] == 6 * 10**18
+    assert (scheduled["scheduleVestable"], scheduled["scheduleRemaining"]) == (10**18, 6 * 10**18)
+    assert (scheduled["nextTrancheTimestamp"], scheduled["nextTrancheAmount"]) == schedule[1]
+    assert not any(status[accounts[3].address].values())
+
+    tx = linearVesting.earlyWithdraw({'from': accounts[1]})
+    assert tx.events["EarlyLinearUnlock"]["penaltyAmount"] == pytest.approx(vesting["earlyWithdrawPenalty"], rel=1e-4)
+    assert tx.events["LinearUnlocked"]["unlockedAmount"] == pytest.approx(vesting["claimable"], rel=1e-4)
+    scheduledVesting.vestTokens(accounts[2])
+    status = vestingStatus(lens, linearVesting, brownie.ZERO_ADDRESS, users)
+    assert status[accounts[1].address]["esnutVesting"] == 0 and status[accounts[1].address]["earlyWithdrawPenalty"] == 0
+    assert status[accounts[2].address]["scheduleRemaining"] == 0
+    assert scheduledVesting.scheduleStatus(accounts[2]) == (0, 5 * 10**18, schedule[1][0], 2 * 10**18)
+
+# Randomized multi-user timelines replayed on the local chain keep supply and balances conserved
+def test_load_simulation():
+    from scripts.vestingLoadSim import simulate
+    report = simulate(40, seed=3)
+    assert report["failed"] == {}
+    assert all(report["invariants"].values()), report["invariants"]
+    assert {"startVesting", "claimVestedTokens", "vestTokens"} <= set(report["gas"])
+    assert report["txs"] == sum(s["count"] for s in report["gas"].values())